@@ -0,0 +1,59 @@
+# backend/app/bench.py
+# Shared plumbing for the game benchmarks (go_bench, chess_bench,
+# sudoku_bench): latency percentiles, regression messages, and the
+# --out / --baseline / --save-baseline / --tolerance command line that
+# writes results, stores a baseline or compares against it.
+import json
+import os
+import sys
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_TOLERANCE = 0.15
+
+# --- 1. STATISTICS ---
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def latency(ms):
+    return {q: round(percentile(ms, p), 3) for q, p in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))}
+
+# --- 2. REGRESSIONS ---
+# Each returns a message when the value moved the wrong way by more than
+# `tolerance` (a fraction), else None
+def dropped(label, now, then, tolerance):
+    if then and now < then * (1 - tolerance): return f"{label}: {now} < {then} (-{1 - now / then:.0%})"
+
+def grew(label, now, then, tolerance, unit=""):
+    if then and now > then * (1 + tolerance): return f"{label}: {now}{unit} > {then}{unit} (+{now / then - 1:.0%})"
+
+# --- 3. COMMAND LINE ---
+def add_baseline_args(parser, name):
+    # name: the bench module, e.g. "go_bench" -> data/go_bench_baseline.json
+    parser.add_argument("--out", help="Write the results as JSON here")
+    parser.add_argument("--baseline", default=os.path.join(DATA_DIR, f"{name}_baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+def finish(result, args, compare):
+    # Writes --out, then saves the baseline or compares against it.
+    # compare(result, baseline, tolerance) -> list of regressions; any
+    # regression exits with status 1.
+    if args.out:
+        with open(args.out, "w") as f: json.dump(result, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f: json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f: baseline = json.load(f)
+        if baseline["config"] != result["config"]:
+            print("Baseline was run with different settings; not comparing")
+        else:
+            problems = compare(result, baseline, args.tolerance)
+            for problem in problems: print(f"REGRESSION {problem}")
+            if problems: sys.exit(1)
+            print(f"No regressions beyond {args.tolerance:.0%} of baseline")
+    else:
+        print(f"No baseline at {args.baseline} (use --save-baseline)")
@@ -1,6 +1,15 @@
 # backend/app/chess_ai.py
 import chess
+import os
 import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .chess_bitbase import probe as probe_bitbase
+from .chess_book import book_move
+from .chess_cache import RESULT_CACHE, cache_key
+from .chess_tt import TranspositionTable, zobrist_hash, push_hashed, EXACT, LOWER, UPPER
 
 # --- 1. KNOWLEDGE BASE (Piece-Square Tables) ---
 # Scores: Positive is good for White, Negative is good for Black (from White's perspective)
@@ -79,95 +88,462 @@ PIECE_VALUES = {
 }
 
 # --- 2. THE EVALUATOR ---
+# Value + PST folded into one signed 64-entry table per (piece, color),
+# built once. Evaluation walks the set bits of each piece bitboard instead
+# of calling piece_at/square_mirror on all 64 squares.
+def build_eval_tables():
+    tables = []
+    for piece_type, table in PST.items():
+        for color in chess.COLORS:
+            sign = 1 if color == chess.WHITE else -1
+            tables.append((piece_type, color, [
+                sign * (PIECE_VALUES[piece_type] + table[square if color == chess.WHITE else chess.square_mirror(square)])
+                for square in chess.SQUARES
+            ]))
+    return tables
+
+EVAL_TABLES = build_eval_tables()
+MATE_SCORE = 9999
+
 def evaluate_board(board):
-    if board.is_checkmate():
-        if board.turn: return -9999 # Black wins (White turn, checkmate)
-        else: return 9999 # White wins
-    if board.is_stalemate() or board.is_insufficient_material(): return 0
+    # Static score only (White positive). Checkmate and stalemate are
+    # detected by the search, which generates the moves anyway.
+    if board.is_insufficient_material(): return 0
 
     score = 0
-    # Evaluate material & position
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if not piece: continue
-        
-        # Base value
-        value = PIECE_VALUES[piece.piece_type] + PST[piece.piece_type][square if piece.color == chess.WHITE else chess.square_mirror(square)]
-        
-        if piece.color == chess.WHITE: score += value
-        else: score -= value
-        
+    pieces_mask = board.pieces_mask
+    for piece_type, color, table in EVAL_TABLES:
+        pieces = pieces_mask(piece_type, color)
+        while pieces:
+            lowest = pieces & -pieces
+            score += table[lowest.bit_length() - 1]
+            pieces ^= lowest
     return score
 
-# --- 3. THE SEARCH (Minimax + Alpha-Beta) ---
-def get_best_move(fen, depth=3):
-    board = chess.Board(fen)
-    
-    best_move = None
-    best_value = -99999
-    alpha = -100000
-    beta = 100000
-    
-    # We assume AI is BLACK (Minimizing player logic, but we maximize the negative for simplicity)
-    # Actually, let's keep it simple: Engine always tries to maximize ITS score.
-    # If Engine is Black, it wants Negative Score. If White, Positive.
-    # Standard Minimax implementation:
-    
-    is_maximizing = board.turn == chess.WHITE
-    
-    # Root Call
-    moves = list(board.legal_moves)
-    # Sort captures first for better pruning (simple heuristic)
-    # moves.sort(key=lambda m: board.is_capture(m), reverse=True) 
-    
-    if not moves: return None
-
-    # Iterative Search
-    for move in moves:
-        board.push(move)
-        board_val = minimax(board, depth - 1, alpha, beta, not is_maximizing)
-        board.pop()
-        
-        if is_maximizing:
-            if board_val > best_value:
-                best_value = board_val
-                best_move = move
-            alpha = max(alpha, board_val)
-        else:
-            # If playing Black, we look for the LOWEST score
-            if best_move is None: # First move init
-                best_value = board_val
-                best_move = move
-            elif board_val < best_value:
-                best_value = board_val
-                best_move = move
-            beta = min(beta, board_val)
-            
-    return best_move.uci()
-
-def minimax(board, depth, alpha, beta, is_maximizing):
-    if depth == 0 or board.is_game_over():
-        return evaluate_board(board)
+# --- 3. THE SEARCH (Minimax + Alpha-Beta + Transposition Table) ---
+# One table shared by every request: the same game (and the same popular
+# openings) keep hitting the same positions move after move.
+TT = TranspositionTable()
 
-    moves = list(board.legal_moves)
-    
-    if is_maximizing:
-        max_eval = -99999
+def capture_score(board, move):
+    # MVV-LVA: most valuable victim first, cheapest attacker breaking ties.
+    # 0 for quiet moves.
+    to_sq = move.to_square
+    if board.occupied_co[not board.turn] & chess.BB_SQUARES[to_sq]:
+        return board.piece_type_at(to_sq) * 8 - board.piece_type_at(move.from_square)
+    if to_sq == board.ep_square and board.pawns & chess.BB_SQUARES[move.from_square]:
+        return chess.PAWN * 8 - chess.PAWN
+    return 0
+
+MAX_DEPTH = 32
+TIME_CHECK_NODES = 128 # How often (in nodes) the clock is read
+DELTA_MARGIN = 200 # Positional slack allowed on top of a capture in quiescence
+HISTORY_MAX = 1 << 20 # Kept below the killer/capture bands in order_moves
+
+class SearchTimeout(Exception):
+    pass
+
+class Search:
+    def __init__(self, table=None, ordering=True):
+        self.table = table if table is not None else TT
+        self.ordering = ordering # False = generator order (for measuring pruning)
+        self.nodes = 0
+        self.deadline = None
+        self.stop = None # Optional threading.Event that cancels the search
+        # Quiet moves that caused a cutoff: two per ply, and a running
+        # score per (side, from, to) across the whole search.
+        self.killers = [[None, None] for _ in range(MAX_DEPTH + 1)]
+        self.history = [[0] * 4096, [0] * 4096]
+
+    def iterate(self, board, max_depth=MAX_DEPTH, max_ms=None, root_moves=None, on_iteration=None, multipv=1):
+        # Iterative deepening: search depth 1, 2, 3... until max_depth or
+        # the time budget runs out. Returns the result of the last
+        # *completed* iteration as (move, score, depth, pv).
+        # root_moves limits the root to a subset of the legal moves;
+        # multipv > 1 also finds the runner-up lines (each one re-searches
+        # the root without the moves already picked);
+        # on_iteration(depth, lines) is called after each iteration with
+        # lines = [(move, score, pv), ...], best first.
+        self.table.new_search()
+        self.nodes = 0
+        self.age_history()
+        start = time.perf_counter()
+        stack_size = len(board.move_stack)
+
+        best_move, best_value, reached, pv = None, 0, 0, []
+        for depth in range(1, max_depth + 1):
+            # Depth 1 always finishes so there is always a move to play
+            if max_ms is not None and depth > 1:
+                self.deadline = start + max_ms / 1000.0
+            # Seed the table with the previous PV so every node on it tries
+            # last iteration's best move first.
+            self.seed_pv(board, pv)
+            try:
+                lines = self.root_lines(board, depth, root_moves, multipv)
+            except SearchTimeout:
+                while len(board.move_stack) > stack_size: board.pop()
+                break
+            finally:
+                self.deadline = None
+            if not lines: break
+
+            (best_move, best_value, pv), reached = lines[0], depth
+            if on_iteration: on_iteration(depth, lines)
+            # A forced mate won't change with more depth
+            if abs(best_value) >= MATE_SCORE: break
+            # Not enough time left to finish another (several times larger) iteration
+            if max_ms is not None and (time.perf_counter() - start) * 1000 > max_ms / 2: break
+
+        return best_move, best_value, reached, pv
+
+    def root_lines(self, board, depth, root_moves, multipv):
+        lines = []
+        remaining = root_moves
+        for _ in range(multipv):
+            move, value = self.root(board, depth, remaining)
+            if move is None: break
+            lines.append((move, value, self.principal_variation(board, depth)))
+            if remaining is None: remaining = set(board.legal_moves)
+            remaining = remaining - {move}
+        # The root entry now holds the last line's move: restore the best
+        if len(lines) > 1: self.table.store_move(zobrist_hash(board), lines[0][0])
+        return lines
+
+    def seed_pv(self, board, pv):
+        key = zobrist_hash(board)
+        for move in pv:
+            self.table.store_move(key, move)
+            key = push_hashed(board, key, move)
+        for _ in pv: board.pop()
+
+    def principal_variation(self, board, depth):
+        # Walk the table's best moves from the root
+        pv = []
+        key = zobrist_hash(board)
+        while len(pv) < depth:
+            move = self.table.best_move(key)
+            if move is None or not board.is_legal(move): break
+            pv.append(move)
+            key = push_hashed(board, key, move)
+        for _ in pv: board.pop()
+        return pv
+
+    def check_limits(self):
+        if self.deadline is not None and time.perf_counter() > self.deadline: raise SearchTimeout()
+        if self.stop is not None and self.stop.is_set(): raise SearchTimeout()
+
+    # --- MOVE ORDERING ---
+    # Hash move, then captures (most valuable victim / least valuable
+    # attacker), promotions, killer moves, and finally quiet moves by history.
+    def order_moves(self, board, moves, hash_move, ply):
+        if not self.ordering:
+            return moves
+
+        killers = self.killers[ply] if ply <= MAX_DEPTH else (None, None)
+        history = self.history[board.turn]
+
+        def score(move):
+            if move == hash_move: return 1 << 30
+            capture = capture_score(board, move)
+            if capture: return (1 << 28) + capture
+            if move.promotion: return (1 << 27) + move.promotion
+            if move == killers[0]: return (1 << 26) + 1
+            if move == killers[1]: return 1 << 26
+            return history[move.from_square * 64 + move.to_square]
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def record_cutoff(self, board, move, depth, ply):
+        # Only quiet moves: captures are already ordered first by MVV-LVA
+        if board.is_capture(move) or move.promotion: return
+        if ply <= MAX_DEPTH:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1], killers[0] = killers[0], move
+        history = self.history[board.turn]
+        idx = move.from_square * 64 + move.to_square
+        history[idx] += depth * depth
+        if history[idx] > HISTORY_MAX: self.age_history()
+
+    def age_history(self):
+        # Halve history between searches (and on overflow) so old games fade
+        for side in self.history:
+            for i in range(4096): side[i] >>= 1
+
+    def root(self, board, depth, root_moves=None):
+        key = zobrist_hash(board)
+
+        best_move = None
+        best_value = -99999
+        alpha = -100000
+        beta = 100000
+
+        # We assume AI is BLACK (Minimizing player logic, but we maximize the negative for simplicity)
+        # Actually, let's keep it simple: Engine always tries to maximize ITS score.
+        # If Engine is Black, it wants Negative Score. If White, Positive.
+        # Standard Minimax implementation:
+
+        is_maximizing = board.turn == chess.WHITE
+
+        # Root Call
+        moves = list(board.legal_moves)
+        if root_moves is not None: moves = [m for m in moves if m in root_moves]
+        if not moves: return None, 0
+
+        # Best move from an earlier search of this position goes first
+        moves = self.order_moves(board, moves, self.table.best_move(key), 0)
+
+        # Iterative Search
         for move in moves:
-            board.push(move)
-            eval_val = minimax(board, depth - 1, alpha, beta, False)
+            child_key = push_hashed(board, key, move)
+            board_val = self.minimax(board, depth - 1, alpha, beta, not is_maximizing, child_key, 1)
             board.pop()
-            max_eval = max(max_eval, eval_val)
-            alpha = max(alpha, eval_val)
-            if beta <= alpha: break
-        return max_eval
-    else:
-        min_eval = 99999
+
+            if is_maximizing:
+                if board_val > best_value:
+                    best_value = board_val
+                    best_move = move
+                alpha = max(alpha, board_val)
+            else:
+                # If playing Black, we look for the LOWEST score
+                if best_move is None: # First move init
+                    best_value = board_val
+                    best_move = move
+                elif board_val < best_value:
+                    best_value = board_val
+                    best_move = move
+                beta = min(beta, board_val)
+
+        # A score over only some of the root moves isn't this position's
+        # value: keep just the move (for ordering) and leave the score alone
+        if root_moves is None: self.table.store(key, depth, EXACT, best_value, best_move)
+        else: self.table.store_move(key, best_move)
+        return best_move, best_value
+
+    def minimax(self, board, depth, alpha, beta, is_maximizing, key, ply):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_NODES == 0: self.check_limits()
+
+        # Probe: a result searched at least this deep answers this node
+        # without searching it again, if its bound falls outside the window.
+        alpha_orig, beta_orig = alpha, beta
+        entry = self.table.probe(key)
+        hash_move = None
+        if entry:
+            _, entry_depth, flag, score, hash_move, _ = entry
+            if entry_depth >= depth:
+                if flag == EXACT: return score
+                if flag == LOWER and score >= beta: return score
+                if flag == UPPER and score <= alpha: return score
+
+        # K+P/R/Q vs K: the bitbase knows the result, nothing to search
+        if board.occupied.bit_count() == 3:
+            score = self.probe_endgame(board, is_maximizing)
+            if score is not None:
+                self.table.store(key, depth, EXACT, score, None)
+                return score
+
+        if depth == 0:
+            # Horizon: settle pending captures before trusting the evaluation
+            score = self.quiesce(board, alpha, beta, is_maximizing, ply)
+            if score <= alpha_orig: flag = UPPER
+            elif score >= beta_orig: flag = LOWER
+            else: flag = EXACT
+            self.table.store(key, 0, flag, score, None)
+            return score
+
+        # Terminal positions: detected here, from the move list we need anyway
+        moves = list(board.legal_moves)
+        if not moves or board.is_insufficient_material() or board.halfmove_clock >= 150:
+            score = self.terminal_score(board, moves, is_maximizing)
+            self.table.store(key, depth, EXACT, score, None)
+            return score
+
+        moves = self.order_moves(board, moves, hash_move, ply)
+
+        best_move = None
+        if is_maximizing:
+            best_eval = -99999
+            for move in moves:
+                child_key = push_hashed(board, key, move)
+                eval_val = self.minimax(board, depth - 1, alpha, beta, False, child_key, ply + 1)
+                board.pop()
+                if eval_val > best_eval or best_move is None:
+                    best_eval, best_move = eval_val, move
+                alpha = max(alpha, eval_val)
+                if beta <= alpha:
+                    self.record_cutoff(board, move, depth, ply)
+                    break
+        else:
+            best_eval = 99999
+            for move in moves:
+                child_key = push_hashed(board, key, move)
+                eval_val = self.minimax(board, depth - 1, alpha, beta, True, child_key, ply + 1)
+                board.pop()
+                if eval_val < best_eval or best_move is None:
+                    best_eval, best_move = eval_val, move
+                beta = min(beta, eval_val)
+                if beta <= alpha:
+                    self.record_cutoff(board, move, depth, ply)
+                    break
+
+        # Store: fail-low is an upper bound, fail-high a lower bound
+        if best_eval <= alpha_orig: flag = UPPER
+        elif best_eval >= beta_orig: flag = LOWER
+        else: flag = EXACT
+        self.table.store(key, depth, flag, best_eval, best_move)
+        return best_eval
+
+    def probe_endgame(self, board, is_maximizing):
+        score = probe_bitbase(board)
+        # A won position can still be mate already: score it as mate so the
+        # search actually delivers it instead of circling the win.
+        if score and board.is_check() and not any(board.generate_legal_moves()):
+            return self.terminal_score(board, [], is_maximizing)
+        return score
+
+    def terminal_score(self, board, moves, is_maximizing):
+        # Mated side to move loses; stalemate and the automatic draws are 0
+        if not moves and board.is_check():
+            return -MATE_SCORE if is_maximizing else MATE_SCORE
+        return 0
+
+    # --- QUIESCENCE ---
+    # Captures only (all evasions when in check), so a leaf is never scored
+    # with a piece hanging. Stand pat: the side to move may decline every
+    # capture, so the static eval is already a bound.
+    def quiesce(self, board, alpha, beta, is_maximizing, ply):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_NODES == 0: self.check_limits()
+
+        if board.occupied.bit_count() == 3:
+            score = self.probe_endgame(board, is_maximizing)
+            if score is not None: return score
+
+        in_check = board.is_check()
+        if in_check:
+            moves = list(board.legal_moves)
+            if not moves: return self.terminal_score(board, moves, is_maximizing)
+            best = -99999 if is_maximizing else 99999
+        else:
+            # Stalemate before standing pat: no move at all is a draw, not
+            # whatever the material says
+            if not any(board.generate_legal_moves()): return self.terminal_score(board, [], is_maximizing)
+            best = evaluate_board(board)
+            if is_maximizing:
+                if best >= beta: return best
+                alpha = max(alpha, best)
+            else:
+                if best <= alpha: return best
+                beta = min(beta, best)
+            moves = list(board.generate_legal_captures())
+            moves.extend(m for m in board.generate_legal_moves(board.pawns) if m.promotion and m not in moves)
+        # Always MVV-LVA here, even with ordering off: unordered capture
+        # sequences blow up and would swamp the main-search node counts.
+        moves.sort(key=lambda m: capture_score(board, m), reverse=True)
+
+        stand_pat = best
         for move in moves:
+            # Delta pruning: even winning the captured piece outright (plus
+            # a margin) can't bring the score back into the window.
+            if not in_check and not move.promotion:
+                gain = PIECE_VALUES[board.piece_type_at(move.to_square) or chess.PAWN] + DELTA_MARGIN
+                if is_maximizing and stand_pat + gain <= alpha: continue
+                if not is_maximizing and stand_pat - gain >= beta: continue
+
             board.push(move)
-            eval_val = minimax(board, depth - 1, alpha, beta, True)
+            score = self.quiesce(board, alpha, beta, not is_maximizing, ply + 1)
             board.pop()
-            min_eval = min(min_eval, eval_val)
-            beta = min(beta, eval_val)
+
+            if is_maximizing:
+                best = max(best, score)
+                alpha = max(alpha, score)
+            else:
+                best = min(best, score)
+                beta = min(beta, score)
             if beta <= alpha: break
-        return min_eval
\ No newline at end of file
+        return best
+
+# --- 4. PARALLEL ROOT SEARCH ---
+# The root moves are dealt round-robin (best-ordered first) to a process
+# pool; every worker runs its own iterative deepening over its share with
+# its own table, which persists in that process between requests. The
+# deepest iteration all workers finished decides the move.
+# CHESS_WORKERS <= 1 keeps the deterministic single-process search.
+WORKERS = int(os.getenv("CHESS_WORKERS", "1"))
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock() # Requests run on threadpool threads
+
+def get_pool(workers):
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != workers:
+            if _pool is not None: _pool.shutdown(wait=False)
+            _pool, _pool_size = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+def search_root_moves(fen, move_ucis, depth, max_ms):
+    # Runs inside a worker process
+    board = chess.Board(fen)
+    search = Search()
+    completed = []
+    search.iterate(board, depth, max_ms, root_moves={chess.Move.from_uci(u) for u in move_ucis},
+                   on_iteration=lambda d, lines: completed.append((d, lines[0][0].uci(), lines[0][1])))
+    return completed, search.nodes
+
+def parallel_best_move(board, depth, max_ms=None, workers=None):
+    # Returns (move, score, depth) or None if the pool can't be used
+    workers = workers or WORKERS
+    moves = list(board.legal_moves)
+    if workers <= 1 or len(moves) < 2: return None
+
+    search = Search()
+    moves = search.order_moves(board, moves, search.table.best_move(zobrist_hash(board)), 0)
+    shares = [moves[i::workers] for i in range(min(workers, len(moves)))]
+    fen = board.fen()
+    try:
+        pool = get_pool(workers)
+        futures = [pool.submit(search_root_moves, fen, [m.uci() for m in share], depth, max_ms) for share in shares]
+        results = [f.result() for f in futures]
+    except (BrokenProcessPool, OSError):
+        return None
+
+    reached = min((completed[-1][0] if completed else 0) for completed, _ in results)
+    if reached == 0: return None
+    # Ties go to the move ordered first, as they would in a serial search
+    sign = 1 if board.turn == chess.WHITE else -1
+    order = {m.uci(): i for i, m in enumerate(moves)}
+    picks = [completed[reached - 1] for completed, _ in results]
+    _, move_uci, score = max(picks, key=lambda p: (sign * p[2], -order[p[1]]))
+    return chess.Move.from_uci(move_uci), score, reached
+
+def get_best_move(fen, depth=3, table=None, max_ms=None, use_book=True, use_cache=True, workers=None):
+    # depth is the deepest iteration allowed; max_ms (if given) stops the
+    # search early and plays the best move of the last finished iteration.
+    # workers > 1 splits the root moves across processes (default: CHESS_WORKERS).
+    board = chess.Board(fen)
+    # Known opening positions are answered from the book, no search at all
+    if use_book:
+        move = book_move(board)
+        if move: return move.uci()
+
+    # Same position searched to the same depth: reuse the earlier answer.
+    # Split and serial searches can pick different moves, so workers counts.
+    workers = max(workers or WORKERS, 1)
+    key = cache_key(board, depth, workers)
+    if use_cache:
+        found, move_uci = RESULT_CACHE.get(key)
+        if found: return move_uci
+
+    result = parallel_best_move(board, depth, max_ms, workers)
+    if result: best_move, score, reached = result
+    else: best_move, score, reached, _ = Search(table).iterate(board, depth, max_ms)
+    move_uci = best_move.uci() if best_move else None
+    # A search the clock cut short (a cold start, a loaded box) would pin a
+    # weaker move: only store ones that finished, or stopped at a mate or
+    # a game that is already over
+    complete = reached == depth or abs(score) >= MATE_SCORE or best_move is None
+    if use_cache and complete: RESULT_CACHE.put(key, move_uci)
+    return move_uci
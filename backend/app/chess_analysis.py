@@ -0,0 +1,163 @@
+# backend/app/chess_analysis.py
+# Background analysis jobs: a FEN or a whole PGN is analysed in a process
+# of its own while the client polls or streams the iterative-deepening
+# updates (depth, score, PV, nodes/sec) as they happen. A relay thread in
+# the API process copies the worker's events into the job, so searches
+# never compete with /move and Go requests for the GIL.
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+import chess
+import chess.pgn
+from .chess_ai import Search, MAX_DEPTH
+from .chess_tt import TranspositionTable
+
+# Half the cores at most, and at a lower priority: interactive requests
+# keep the rest
+MAX_RUNNING_JOBS = int(os.getenv("CHESS_ANALYSIS_JOBS", str(max(1, (os.cpu_count() or 2) // 2))))
+ANALYSIS_NICE = 10
+MAX_POSITIONS = 200 # Plies of a PGN (plus the start position)
+MAX_JOB_MS = 600000 # Positions x per-position budget
+JOB_TTL = 600 # Seconds a finished job is kept for late readers
+POLL_S = 0.5 # Relay wait between checks that the worker is still alive
+
+_context = multiprocessing.get_context()
+
+# --- WORKER PROCESS ---
+def analyse_positions(positions, depth, max_ms, multipv, events, cancelled):
+    # Puts ("info", event), ("result", lines) per position, then one
+    # ("done" | "cancelled" | "error", message) on the events queue
+    if hasattr(os, "nice"): os.nice(ANALYSIS_NICE)
+    # One search (table, killers, history) for the whole job, so each
+    # position of a game starts from what the previous one learned.
+    search = Search(TranspositionTable(1 << 16))
+    search.stop = cancelled
+    try:
+        for index, (fen, played) in enumerate(positions):
+            if cancelled.is_set(): break
+            events.put(("result", analyse(search, index, fen, played, depth, max_ms, multipv, events)))
+        events.put(("cancelled" if cancelled.is_set() else "done", None))
+    except Exception as e:
+        events.put(("error", str(e)))
+
+def analyse(search, index, fen, played, depth, max_ms, multipv, events):
+    board = chess.Board(fen)
+    start = time.perf_counter()
+    last = {"index": index, "fen": fen, "played": played, "depth": 0, "lines": []}
+
+    def on_iteration(reached, lines):
+        elapsed = time.perf_counter() - start
+        last.update({
+            "depth": reached,
+            "lines": [{"move": move.uci(), "score": score, "pv": [m.uci() for m in pv]}
+                      for move, score, pv in lines],
+            "nodes": search.nodes,
+            "nps": int(search.nodes / elapsed) if elapsed > 0 else 0,
+            "time_ms": int(elapsed * 1000),
+        })
+        events.put(("info", dict(last, type="info")))
+
+    if not board.is_game_over():
+        search.iterate(board, depth, max_ms, on_iteration=on_iteration, multipv=multipv)
+    return last
+
+# --- JOBS ---
+class AnalysisJob:
+    def __init__(self, positions, depth, max_ms, multipv):
+        self.id = uuid.uuid4().hex
+        self.positions = positions # [(fen, move played to reach it or None)]
+        self.depth = depth
+        self.max_ms = max_ms
+        self.multipv = multipv
+        self.status = "queued"
+        self.events = [] # Append-only; readers keep their own cursor
+        self.results = [] # Final lines per position
+        self.error = None
+        self.finished_at = None
+        self.cancelled = _context.Event() # Seen by the worker process too
+
+    def run(self):
+        # Relay thread: starts the worker and copies its events over
+        self.status = "running"
+        events = _context.Queue()
+        worker = _context.Process(target=analyse_positions, daemon=True,
+                                  args=(self.positions, self.depth, self.max_ms, self.multipv, events, self.cancelled))
+        status, error = "error", None
+        try:
+            worker.start()
+            while True:
+                try:
+                    kind, payload = events.get(timeout=POLL_S)
+                except queue.Empty:
+                    if worker.is_alive(): continue
+                    try: # Whatever it put before exiting
+                        kind, payload = events.get(timeout=POLL_S)
+                    except queue.Empty:
+                        kind, payload = "error", "Analysis process died"
+                if kind == "info": self.events.append(payload)
+                elif kind == "result": self.results.append(payload)
+                else:
+                    status, error = kind, payload
+                    break
+        except Exception as e:
+            error = str(e)
+        worker.join(POLL_S)
+        if worker.is_alive(): worker.kill()
+        self.status, self.error = status, error
+        # Final event before finished_at: streams stop once both are seen
+        self.events.append({"type": self.status, "error": self.error})
+        self.finished_at = time.time()
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "positions": len(self.positions),
+            "analysed": len(self.results),
+            "results": self.results,
+            "error": self.error,
+        }
+
+# --- JOB REGISTRY ---
+jobs = {} # job id -> AnalysisJob
+
+def positions_from_pgn(pgn_text):
+    game = chess.pgn.read_game(io.StringIO(pgn_text))
+    if game is None: raise ValueError("Invalid PGN")
+    board = game.board()
+    positions = [(board.fen(), None)]
+    for move in game.mainline_moves():
+        san = board.san(move)
+        board.push(move)
+        positions.append((board.fen(), san))
+    return positions
+
+def submit_job(fen=None, pgn=None, depth=8, max_ms=2000, multipv=1):
+    prune_jobs()
+    running = sum(1 for job in jobs.values() if job.status in ("queued", "running"))
+    if running >= MAX_RUNNING_JOBS: raise RuntimeError("Too many analysis jobs running")
+
+    if pgn: positions = positions_from_pgn(pgn)
+    else: positions = [(chess.Board(fen).fen(), None)] # Validates the FEN
+    if len(positions) > MAX_POSITIONS: raise ValueError(f"At most {MAX_POSITIONS - 1} moves per game")
+    if len(positions) * max_ms > MAX_JOB_MS:
+        raise ValueError(f"Too long: {len(positions)} positions x {max_ms} ms is over {MAX_JOB_MS // 1000} s")
+
+    job = AnalysisJob(positions, min(max(depth, 1), MAX_DEPTH), max_ms, max(multipv, 1))
+    jobs[job.id] = job
+    threading.Thread(target=job.run, daemon=True).start()
+    return job
+
+def cancel_job(job_id):
+    job = jobs.get(job_id)
+    if job: job.cancelled.set()
+    return job
+
+def prune_jobs():
+    now = time.time()
+    for job_id in [j.id for j in jobs.values() if j.finished_at and now - j.finished_at > JOB_TTL]:
+        del jobs[job_id]
@@ -0,0 +1,165 @@
+# backend/app/chess_bench.py
+# Chess engine benchmark: perft on standard positions (move generation
+# correctness and speed) plus fixed-depth searches over a fixed position
+# set (nodes, nodes/sec, time-to-depth, chosen move).
+#
+# Usage:
+#   python -m app.chess_bench                     # run, compare to baseline
+#   python -m app.chess_bench --save-baseline     # run, store as baseline
+#   python -m app.chess_bench --out results.json --tolerance 0.2
+#   python -m app.chess_bench --ordering [depth]  # ordered vs unordered nodes
+import argparse
+import json
+import sys
+import time
+import chess
+from .bench import add_baseline_args, dropped, finish, grew
+from .chess_ai import Search
+from .chess_tt import TranspositionTable
+
+BENCH_FENS = [
+    chess.STARTING_FEN,
+    # Kiwipete: castling, pins, en passant all over the board
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+    "r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2Q1RK1 w - - 0 10",
+    "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/2NP1N2/PPP2PPP/R1BQ1RK1 b - - 0 7",
+    "2rq1rk1/pp1bppbp/3p1np1/8/3NP3/1BN1BP2/PPPQ2PP/2KR3R b - - 0 12",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "8/5pk1/6p1/8/3R4/6P1/5PK1/2r5 w - - 0 40",
+]
+
+# Standard perft positions with their known leaf counts per depth
+PERFT_POSITIONS = [
+    (chess.STARTING_FEN, [20, 400, 8902, 197281]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379]),
+]
+
+# --- 1. PERFT ---
+def perft(board, depth):
+    if depth == 1: return board.legal_moves.count()
+    total = 0
+    for move in board.legal_moves:
+        board.push(move)
+        total += perft(board, depth - 1)
+        board.pop()
+    return total
+
+def run_perft(max_depth=3):
+    rows = []
+    for fen, expected in PERFT_POSITIONS:
+        depth = min(max_depth, len(expected))
+        start = time.perf_counter()
+        nodes = perft(chess.Board(fen), depth)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "fen": fen, "depth": depth, "nodes": nodes,
+            "ok": nodes == expected[depth - 1],
+            "nps": int(nodes / elapsed) if elapsed > 0 else 0,
+        })
+    return rows
+
+# --- 2. FIXED-DEPTH SEARCH ---
+def run_search(depth=3):
+    # Fresh table per position so results don't depend on the run order
+    rows = []
+    for fen in BENCH_FENS:
+        search = Search(TranspositionTable())
+        start = time.perf_counter()
+        time_to_depth = {}
+        def on_iteration(d, lines):
+            time_to_depth[d] = round((time.perf_counter() - start) * 1000, 2)
+        move, score, reached, _ = search.iterate(chess.Board(fen), depth, on_iteration=on_iteration)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            "fen": fen, "depth": reached, "move": move.uci() if move else None,
+            "score": score, "nodes": search.nodes,
+            "nps": int(search.nodes / elapsed) if elapsed > 0 else 0,
+            "time_ms": round(elapsed * 1000, 2),
+            "time_to_depth_ms": time_to_depth,
+        })
+    return rows
+
+def summarize(perft_rows, search_rows):
+    def total(rows, field): return sum(r[field] for r in rows)
+    search_ms = total(search_rows, "time_ms")
+    return {
+        "perft_ok": all(r["ok"] for r in perft_rows),
+        "perft_nps": int(sum(r["nps"] for r in perft_rows) / max(len(perft_rows), 1)),
+        "search_nodes": total(search_rows, "nodes"),
+        "search_time_ms": round(search_ms, 2),
+        "search_nps": int(total(search_rows, "nodes") / (search_ms / 1000)) if search_ms else 0,
+    }
+
+# --- 3. BASELINE COMPARISON ---
+def compare(result, baseline, tolerance):
+    # Returns a list of regressions. Speed may not drop, and node counts or
+    # search time may not grow, by more than `tolerance` (a fraction).
+    # Changed moves are reported too: they mean the search itself changed.
+    problems = []
+    now, then = result["summary"], baseline["summary"]
+    if not now["perft_ok"]: problems.append("perft node counts are wrong")
+    for field in ("perft_nps", "search_nps"): problems.append(dropped(field, now[field], then[field], tolerance))
+    for field in ("search_nodes", "search_time_ms"): problems.append(grew(field, now[field], then[field], tolerance))
+    old_moves = {r["fen"]: r["move"] for r in baseline["search"]}
+    for row in result["search"]:
+        if row["fen"] in old_moves and old_moves[row["fen"]] != row["move"]:
+            problems.append(f"move changed: {old_moves[row['fen']]} -> {row['move']} in {row['fen']}")
+    return [p for p in problems if p]
+
+def run_benchmark(depth=3, perft_depth=3):
+    perft_rows = run_perft(perft_depth)
+    search_rows = run_search(depth)
+    return {
+        "config": {"depth": depth, "perft_depth": perft_depth},
+        "summary": summarize(perft_rows, search_rows),
+        "perft": perft_rows,
+        "search": search_rows,
+    }
+
+# --- 4. NODE COUNTS (MOVE ORDERING) ---
+def ordering_report(depth=2):
+    # Same positions, same depth, fresh tables: the only difference is
+    # whether moves are ordered, so the node ratio is the pruning gain.
+    rows = []
+    for fen in BENCH_FENS:
+        row = {"fen": fen}
+        for label, ordering in (("unordered", False), ("ordered", True)):
+            search = Search(TranspositionTable(), ordering=ordering)
+            search.iterate(chess.Board(fen), depth)
+            row[label] = search.nodes
+        rows.append(row)
+    return rows
+
+def print_ordering(depth):
+    total = {"unordered": 0, "ordered": 0}
+    for row in ordering_report(depth):
+        total["unordered"] += row["unordered"]
+        total["ordered"] += row["ordered"]
+        print(f"{row['unordered']:>10} {row['ordered']:>10}  {row['fen']}")
+    print(f"{total['unordered']:>10} {total['ordered']:>10}  TOTAL "
+          f"({total['unordered'] / max(total['ordered'], 1):.1f}x fewer nodes)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chess engine benchmark")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--perft-depth", type=int, default=3)
+    add_baseline_args(parser, "chess_bench")
+    parser.add_argument("--ordering", type=int, nargs="?", const=2, metavar="DEPTH",
+                        help="Only print ordered vs unordered node counts")
+    args = parser.parse_args()
+
+    if args.ordering:
+        print_ordering(args.ordering)
+        sys.exit(0)
+
+    result = run_benchmark(args.depth, args.perft_depth)
+    for row in result["perft"]:
+        print(f"perft {row['depth']} {'ok ' if row['ok'] else 'BAD'} {row['nodes']:>9} {row['nps']:>9} nps  {row['fen']}")
+    for row in result["search"]:
+        print(f"depth {row['depth']} {row['move']} {row['score']:>6} {row['nodes']:>8} nodes {row['nps']:>7} nps {row['time_ms']:>9} ms  {row['fen']}")
+    print(json.dumps(result["summary"]))
+    finish(result, args, compare)
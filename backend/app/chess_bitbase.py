@@ -0,0 +1,204 @@
+# backend/app/chess_bitbase.py
+# Endgame bitbases for KPK, KRK and KQK, built offline by retrograde
+# analysis and memory-mapped on import. Each position (side to move and the
+# three squares) gets a 4-bit entry: 0 = draw, n = the side with the extra
+# piece wins in n moves (mate, or a winning promotion for KPK), saturated
+# at 15. Knowing the distance, not just the win, is what lets the search
+# convert instead of circling a won position. 2 * 64^3 nibbles = 256 KB.
+#
+# Regenerate with: python -m app.chess_bitbase
+import mmap
+import os
+import chess
+
+BITBASE_DIR = os.path.join(os.path.dirname(__file__), "data", "bitbases")
+TABLES = {chess.PAWN: "kpk", chess.ROOK: "krk", chess.QUEEN: "kqk"}
+ENTRIES = 64 * 64 * 64 # Per side to move
+MAX_DISTANCE = 15
+
+# Wins score below a real mate (9999) but above any material swing; faster
+# wins score higher, with a small progress term breaking ties. KPK sits in
+# a lower band since its distance only counts to the promotion: promoting
+# must always look better than staying a pawn.
+WIN_BASE = {chess.PAWN: 2000, chess.ROOK: 5000, chess.QUEEN: 5000}
+DISTANCE_WEIGHT = 200
+
+def index(white_king, black_king, piece):
+    return (white_king * 64 + black_king) * 64 + piece
+
+# --- 1. LOOKUP ---
+_tables = {}
+
+def load_bitbases():
+    for piece_type, name in TABLES.items():
+        path = os.path.join(BITBASE_DIR, name + ".bin")
+        if piece_type in _tables or not os.path.exists(path): continue
+        with open(path, "rb") as f:
+            _tables[piece_type] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def probe(board):
+    # Returns a score (White positive) for K+P/R/Q vs K, or None when the
+    # position isn't covered. Draws are exactly 0.
+    if board.occupied.bit_count() != 3: return None
+    extra = board.occupied & ~board.kings
+    piece_type = board.piece_type_at(extra.bit_length() - 1)
+    table = _tables.get(piece_type)
+    if table is None: return None
+
+    strong = bool(board.occupied_co[chess.WHITE] & extra)
+    strong_king = board.king(strong)
+    weak_king = board.king(not strong)
+    piece = extra.bit_length() - 1
+    white_to_move = board.turn == strong
+    if not strong:
+        # Tables are stored with White as the strong side: mirror the board
+        strong_king, weak_king, piece = strong_king ^ 56, weak_king ^ 56, piece ^ 56
+
+    distance = read(table, index(strong_king, weak_king, piece) + (0 if white_to_move else ENTRIES))
+    if not distance: return 0
+
+    score = WIN_BASE[piece_type] + DISTANCE_WEIGHT * (MAX_DISTANCE + 1 - distance) + progress(piece_type, strong_king, weak_king, piece)
+    return score if strong == chess.WHITE else -score
+
+def read(table, i):
+    return (table[i >> 1] >> (4 * (i & 1))) & 0xF
+
+def progress(piece_type, strong_king, weak_king, piece):
+    # Tie-breaks among equally distant wins (and past the saturation).
+    # Pawn: push it. Rook/queen: lone king to the edge, ours closer.
+    if piece_type == chess.PAWN:
+        return 20 * chess.square_rank(piece)
+    file, rank = chess.square_file(weak_king), chess.square_rank(weak_king)
+    edge = max(3 - file, file - 4) + max(3 - rank, rank - 4)
+    return 10 * edge + 4 * (14 - chess.square_manhattan_distance(strong_king, weak_king))
+
+load_bitbases()
+
+# --- 2. GENERATOR (RETROGRADE ANALYSIS) ---
+KING_MOVES = [list(chess.scan_forward(chess.BB_KING_ATTACKS[sq])) for sq in chess.SQUARES]
+DIRECTIONS = {
+    chess.ROOK: [(1, 0), (-1, 0), (0, 1), (0, -1)],
+    chess.QUEEN: [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)],
+}
+
+def rays(square, directions):
+    out = []
+    for df, dr in directions:
+        f, r = chess.square_file(square) + df, chess.square_rank(square) + dr
+        ray = []
+        while 0 <= f < 8 and 0 <= r < 8:
+            ray.append(chess.square(f, r))
+            f, r = f + df, r + dr
+        out.append(ray)
+    return out
+
+def attacks(piece_type, piece, target, blocker):
+    # Does the white piece on `piece` attack `target`, with `blocker` (the
+    # white king) possibly in the way? The black king never blocks since
+    # it is the one moving.
+    if piece_type == chess.PAWN:
+        return bool(chess.BB_PAWN_ATTACKS[chess.WHITE][piece] & chess.BB_SQUARES[target])
+    if not chess.BB_RAYS[piece][target] or piece == target: return False
+    if piece_type == chess.ROOK and chess.square_file(piece) != chess.square_file(target) \
+            and chess.square_rank(piece) != chess.square_rank(target):
+        return False
+    return not chess.between(piece, target) & chess.BB_SQUARES[blocker]
+
+def generate(piece_type, promotion_tables=None):
+    # Fixed-point iteration on "white wins": white to move wins if any
+    # move reaches a won black-to-move position; black to move is lost if
+    # it is mated or every legal move reaches a won white-to-move position.
+    # The pass in which a position is first won is its distance in moves.
+    win_w, win_b = bytearray(ENTRIES), bytearray(ENTRIES)
+    piece_rays = {sq: rays(sq, DIRECTIONS[piece_type]) for sq in chess.SQUARES} if piece_type != chess.PAWN else None
+
+    open_w, open_b = [], []
+    for wk in chess.SQUARES:
+        for bk in chess.SQUARES:
+            if bk == wk or bk in KING_MOVES[wk]: continue
+            for p in chess.SQUARES:
+                if p == wk or p == bk: continue
+                if piece_type == chess.PAWN and chess.square_rank(p) in (0, 7): continue
+                open_b.append((wk, bk, p))
+                if not attacks(piece_type, p, bk, wk): open_w.append((wk, bk, p))
+
+    def white_moves(wk, bk, p):
+        # Yields the black-to-move index after each white move; promotions
+        # yield -1 (won) or -2 (not won) instead.
+        for t in KING_MOVES[wk]:
+            if t != p and t not in KING_MOVES[bk]: yield index(t, bk, p)
+        if piece_type == chess.PAWN:
+            up = p + 8
+            if up == wk or up == bk: return
+            if chess.square_rank(up) == 7:
+                # Promote to whichever of queen or rook wins
+                yield -1 if any(read(t, ENTRIES + index(wk, bk, up)) for t in promotion_tables) else -2
+                return
+            yield index(wk, bk, up)
+            if chess.square_rank(p) == 1 and up + 8 != wk and up + 8 != bk:
+                yield index(wk, bk, up + 8)
+        else:
+            for ray in piece_rays[p]:
+                for t in ray:
+                    if t == wk or t == bk: break
+                    yield index(wk, bk, t)
+
+    changed, distance = True, 0
+    while changed:
+        changed, distance = False, distance + 1
+        mark = min(distance, MAX_DISTANCE)
+        still_open = []
+        for wk, bk, p in open_b:
+            has_move, lost, draw = False, True, False
+            for t in KING_MOVES[bk]:
+                if t in KING_MOVES[wk]: continue
+                if t == p:
+                    if p in KING_MOVES[wk]: continue
+                    draw = True # Takes the undefended piece
+                    break
+                if attacks(piece_type, p, t, wk): continue
+                has_move = True
+                if not win_w[index(wk, t, p)]: lost = False
+            if draw: continue
+            if not has_move:
+                # Mate is a win; stalemate is a permanent draw
+                if attacks(piece_type, p, bk, wk):
+                    win_b[index(wk, bk, p)] = mark
+                    changed = True
+                continue
+            if lost:
+                win_b[index(wk, bk, p)] = mark
+                changed = True
+            else:
+                still_open.append((wk, bk, p))
+        open_b = still_open
+
+        still_open = []
+        for wk, bk, p in open_w:
+            if any(r == -1 or (r >= 0 and win_b[r]) for r in white_moves(wk, bk, p)):
+                win_w[index(wk, bk, p)] = mark
+                changed = True
+            else:
+                still_open.append((wk, bk, p))
+        open_w = still_open
+
+    return pack(win_w) + pack(win_b)
+
+def pack(distances):
+    # Two 4-bit entries per byte, low nibble first
+    out = bytearray(len(distances) // 2)
+    for i, d in enumerate(distances):
+        if d: out[i >> 1] |= d << (4 * (i & 1))
+    return bytes(out)
+
+if __name__ == "__main__":
+    os.makedirs(BITBASE_DIR, exist_ok=True)
+    built = {}
+    # KPK needs the queen and rook tables to score promotions
+    for piece_type in (chess.QUEEN, chess.ROOK, chess.PAWN):
+        promotion_tables = [built[chess.QUEEN], built[chess.ROOK]] if piece_type == chess.PAWN else None
+        data = generate(piece_type, promotion_tables)
+        built[piece_type] = data
+        with open(os.path.join(BITBASE_DIR, TABLES[piece_type] + ".bin"), "wb") as f: f.write(data)
+        wins = sum(1 for i in range(2 * ENTRIES) if read(data, i))
+        print(f"{TABLES[piece_type]}: {wins} winning positions")
@@ -0,0 +1,93 @@
+# backend/app/chess_book.py
+# Polyglot opening book: sorted 16-byte entries (key, move, weight, learn),
+# memory-mapped and binary-searched on the position's Zobrist key.
+#
+# Build a book offline from PGN files:
+#   python -m app.chess_book games.pgn [more.pgn ...] -o app/data/opening_book.bin
+import argparse
+import os
+import random
+import chess
+import chess.pgn
+import chess.polyglot
+from .chess_tt import zobrist_hash
+
+BOOK_PATH = os.getenv("CHESS_BOOK_PATH", os.path.join(os.path.dirname(__file__), "data", "opening_book.bin"))
+
+# --- 1. LOOKUP ---
+_book = None
+_book_missing = False
+
+def get_book():
+    # Opened once per process; the OS pages entries in on demand.
+    global _book, _book_missing
+    if _book is None and not _book_missing:
+        if os.path.exists(BOOK_PATH):
+            _book = chess.polyglot.open_reader(BOOK_PATH)
+        else:
+            _book_missing = True
+    return _book
+
+def book_move(board):
+    # Weighted random pick among the book moves for this position, or None
+    book = get_book()
+    if book is None: return None
+    entries = list(book.find_all(board))
+    if not entries: return None
+    weights = [e.weight for e in entries]
+    return random.choices(entries, weights=weights)[0].move
+
+# --- 2. BUILDER ---
+def encode_move(board, move):
+    # Polyglot stores castling as "king takes own rook" (e1h1, not e1g1)
+    to_square = move.to_square
+    if board.is_castling(move):
+        rook_file = 7 if chess.square_file(move.to_square) > chess.square_file(move.from_square) else 0
+        to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | (move.from_square << 6) | (promotion << 12)
+
+def build_book(pgn_paths, out_path, max_ply=20, min_count=2):
+    # Weight = score of the side that played the move: 2 per win, 1 per
+    # draw. Moves seen fewer than min_count times are dropped as noise.
+    counts = {}
+    scores = {}
+    for path in pgn_paths:
+        with open(path, encoding="utf-8", errors="replace") as pgn:
+            while True:
+                game = chess.pgn.read_game(pgn)
+                if game is None: break
+                result = game.headers.get("Result", "*")
+                board = game.board()
+                for ply, move in enumerate(game.mainline_moves()):
+                    if ply >= max_ply: break
+                    entry = (zobrist_hash(board), encode_move(board, move))
+                    counts[entry] = counts.get(entry, 0) + 1
+                    if result == "1/2-1/2": points = 1
+                    elif result == ("1-0" if board.turn == chess.WHITE else "0-1"): points = 2
+                    else: points = 0
+                    scores[entry] = scores.get(entry, 0) + points
+                    board.push(move)
+
+    entries = [(key, raw, scores[(key, raw)]) for (key, raw), n in counts.items()
+               if n >= min_count and scores[(key, raw)] > 0]
+    # Polyglot weights are 16-bit: scale down if the top move overflows
+    top = max((w for _, _, w in entries), default=1)
+    scale = min(1.0, 0xFFFF / top)
+    entries.sort(key=lambda e: (e[0], -e[2]))
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "wb") as out:
+        for key, raw, weight in entries:
+            out.write(chess.polyglot.ENTRY_STRUCT.pack(key, raw, max(1, int(weight * scale)), 0))
+    return len(entries)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a Polyglot opening book from PGN files")
+    parser.add_argument("pgn", nargs="+")
+    parser.add_argument("-o", "--out", default=BOOK_PATH)
+    parser.add_argument("--max-ply", type=int, default=20)
+    parser.add_argument("--min-count", type=int, default=2)
+    args = parser.parse_args()
+    n = build_book(args.pgn, args.out, args.max_ply, args.min_count)
+    print(f"Wrote {n} entries to {args.out}")
@@ -0,0 +1,107 @@
+# backend/app/chess_cache.py
+# Best-move results shared across requests: an in-process LRU in front of
+# an optional SQLite file (CHESS_CACHE_DB) that survives restarts and is
+# shared by every worker on the box.
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.getenv("CHESS_CACHE_SIZE", "10000"))
+CACHE_DB = os.getenv("CHESS_CACHE_DB") # Unset = memory only
+CACHE_DB_SIZE = int(os.getenv("CHESS_CACHE_DB_SIZE", "1000000")) # Rows kept on disk
+CACHE_DB_TTL = float(os.getenv("CHESS_CACHE_DB_TTL", str(30 * 86400))) # Seconds a row is served
+PRUNE_EVERY = 1000 # Writes between trims of the disk table
+
+# Below this the 50/75-move rules are out of reach of any search we run,
+# so the clocks can't change the answer and are left out of the key.
+SAFE_HALFMOVE_CLOCK = 100
+
+def normalize_position(board):
+    # En passant only counts when a capture is actually possible
+    key = board.fen(en_passant="legal")
+    placement = key.rsplit(" ", 2)[0]
+    if board.halfmove_clock < SAFE_HALFMOVE_CLOCK:
+        return placement
+    return f"{placement} {board.halfmove_clock}"
+
+def cache_key(board, depth, workers=1):
+    # Only searches that finished `depth` are stored, so the time budget
+    # they ran under doesn't change the answer and isn't part of the key
+    return f"{normalize_position(board)}|d{depth}|w{workers}"
+
+class ResultCache:
+    def __init__(self, size=CACHE_SIZE, db_path=CACHE_DB):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.db = None
+        self.writes = 0
+        if db_path:
+            self.db = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+            # WAL: readers in other workers don't block on our writes
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS best_moves (key TEXT PRIMARY KEY, move TEXT, created REAL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS best_moves_created ON best_moves (created)")
+            self.db.commit()
+
+    def get(self, key):
+        # Returns (found, move). move may be None for finished games.
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            if self.db is not None:
+                row = self.db.execute("SELECT move FROM best_moves WHERE key = ? AND created > ?",
+                                      (key, time.time() - CACHE_DB_TTL)).fetchone()
+                if row is not None:
+                    move = row[0] or None
+                    self._remember(key, move)
+                    self.disk_hits += 1
+                    return True, move
+            self.misses += 1
+            return False, None
+
+    def put(self, key, move):
+        with self.lock:
+            self._remember(key, move)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO best_moves VALUES (?, ?, ?)", (key, move or "", time.time()))
+                self.writes += 1
+                if self.writes % PRUNE_EVERY == 0: self._prune()
+                self.db.commit()
+
+    def _prune(self):
+        # Drops expired rows, then the oldest beyond CACHE_DB_SIZE
+        self.db.execute("DELETE FROM best_moves WHERE created <= ?", (time.time() - CACHE_DB_TTL,))
+        self.db.execute("DELETE FROM best_moves WHERE key IN (SELECT key FROM best_moves "
+                        "ORDER BY created DESC LIMIT -1 OFFSET ?)", (CACHE_DB_SIZE,))
+
+    def _remember(self, key, move):
+        self.entries[key] = move
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk": self.db is not None,
+        }
+
+RESULT_CACHE = ResultCache()
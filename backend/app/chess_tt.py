@@ -0,0 +1,124 @@
+# backend/app/chess_tt.py
+import chess
+import chess.polyglot
+
+# --- 1. ZOBRIST KEYS ---
+# We use the Polyglot random array so our keys are the same 64-bit keys
+# every other chess tool (and opening book) uses for a position.
+RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+_HASHER = chess.polyglot.ZobristHasher(RANDOM)
+TURN_KEY = RANDOM[780]
+
+# Rook hops for castling moves, indexed by the king's destination square
+CASTLING_ROOKS = {
+    chess.G1: (chess.H1, chess.F1),
+    chess.C1: (chess.A1, chess.D1),
+    chess.G8: (chess.H8, chess.F8),
+    chess.C8: (chess.A8, chess.D8),
+}
+
+def piece_key(piece_type, color, square):
+    return RANDOM[64 * ((piece_type - 1) * 2 + color) + square]
+
+def zobrist_hash(board):
+    # Full hash from scratch. Only needed once per search (at the root).
+    return _HASHER(board)
+
+def _state_key(board):
+    # The parts of the key that depend on castling rights and en passant
+    key = _HASHER.hash_ep_square(board) if board.ep_square else 0
+    if board.castling_rights: key ^= _HASHER.hash_castling(board)
+    return key
+
+def push_hashed(board, key, move):
+    # Pushes the move and returns the key of the new position, updating
+    # only the squares the move touches instead of rehashing 64 squares.
+    color = board.turn
+    from_sq, to_sq = move.from_square, move.to_square
+    piece_type = board.piece_type_at(from_sq)
+
+    key ^= _state_key(board) ^ TURN_KEY
+    key ^= piece_key(piece_type, color, from_sq)
+    key ^= piece_key(move.promotion or piece_type, color, to_sq)
+
+    if piece_type == chess.PAWN and to_sq == board.ep_square:
+        # En passant: the captured pawn sits behind the target square
+        cap_sq = to_sq - 8 if color == chess.WHITE else to_sq + 8
+        key ^= piece_key(chess.PAWN, not color, cap_sq)
+    else:
+        captured = board.piece_type_at(to_sq)
+        if captured: key ^= piece_key(captured, not color, to_sq)
+
+    if piece_type == chess.KING and abs(to_sq - from_sq) == 2:
+        rook_from, rook_to = CASTLING_ROOKS[to_sq]
+        key ^= piece_key(chess.ROOK, color, rook_from) ^ piece_key(chess.ROOK, color, rook_to)
+
+    board.push(move)
+    return key ^ _state_key(board)
+
+# --- 2. TRANSPOSITION TABLE ---
+# Bound types for stored scores
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    # Fixed-size, single-bucket table indexed by the low bits of the key.
+    # Entries are tuples: (key, depth, flag, score, move, generation).
+    #
+    # Replacement policy: an entry is overwritten when it is empty, from an
+    # older search (generation), for the same position, or when the new
+    # result was searched at least as deep. Otherwise the deeper, fresher
+    # entry is kept since it saved more work.
+    def __init__(self, size=1 << 18):
+        # Round down to a power of two so indexing is a single mask
+        self.size = 1 << (max(size, 1).bit_length() - 1)
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.probes = 0
+
+    def new_search(self):
+        # Called once per root search so stale entries age out
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.hits = self.probes = 0
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        idx = key & self.mask
+        old = self.entries[idx]
+        if (old is None or old[0] == key or old[5] != self.generation
+                or depth >= old[1]):
+            # Keep the old best move if this result didn't find one
+            if move is None and old is not None and old[0] == key:
+                move = old[4]
+            self.entries[idx] = (key, depth, flag, score, move, self.generation)
+
+    def store_move(self, key, move):
+        # Sets the best move for a position but keeps any stored score.
+        # Depth -1 on a fresh entry means it can never cut a search off.
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.entries[key & self.mask] = entry[:4] + (move, self.generation)
+        else:
+            self.store(key, -1, EXACT, 0, move)
+
+    def best_move(self, key):
+        entry = self.probe(key)
+        return entry[4] if entry else None
+
+    def usage(self):
+        # Permille of slots filled by the current search (UCI "hashfull")
+        sample = self.entries[:1000]
+        used = sum(1 for e in sample if e is not None and e[5] == self.generation)
+        return used * 1000 // len(sample)
@@ -1,90 +1,484 @@
 # backend/app/go_ai.py
+import math
+import os
 import random
-import copy
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from .go_array import score_moves, to_array
+from .go_patterns import EDGE, NEUTRAL, PRIORS, RING
 
 # 0 = Empty, 1 = Black (Player), 2 = White (Bot)
-SIZE = 9
+SIZE = 9 # Default board size
+SIZES = (9, 13, 19)
+
+@lru_cache(maxsize=None)
+def geometry(size):
+    # Per board size, shared by every board of that size: neighbour and
+    # diagonal lists per flat point (p = r * size + c), Zobrist keys per
+    # point and colour (the position hash is the XOR over stones), and for
+    # the 3x3 pattern codes: which (point, bit shift) each point appears
+    # at in its ring neighbours' codes, and the codes of an empty board.
+    def around(r, c, steps):
+        return [nr * size + nc for nr, nc in ((r + dr, c + dc) for dr, dc in steps)
+                if 0 <= nr < size and 0 <= nc < size]
+    neighbors = [around(r, c, ((-1, 0), (1, 0), (0, -1), (0, 1))) for r in range(size) for c in range(size)]
+    diagonals = [around(r, c, ((-1, -1), (-1, 1), (1, -1), (1, 1))) for r in range(size) for c in range(size)]
+    rng = random.Random(size)
+    zobrist = [[0, rng.getrandbits(64), rng.getrandbits(64)] for _ in range(size * size)]
+    ring = [[] for _ in range(size * size)]
+    empty_codes = [0] * (size * size)
+    for r in range(size):
+        for c in range(size):
+            for k, (dr, dc) in enumerate(RING):
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < size and 0 <= nc < size: ring[nr * size + nc].append((r * size + c, 2 * k))
+                else: empty_codes[r * size + c] |= EDGE << (2 * k)
+    return neighbors, diagonals, zobrist, ring, empty_codes
 
 class GoBoard:
-    def __init__(self, board=None):
-        self.board = board if board else [[0]*SIZE for _ in range(SIZE)]
+    # Stones are kept in groups with union-find (union by size, no path
+    # compression so every change can be undone). Each group root holds
+    # its stone list and liberty set, updated incrementally by make_move.
+    # Every write goes through a journal, so undo() restores the previous
+    # position without copying the board.
+    def __init__(self, board=None, size=None):
+        self.size = len(board) if board else size or SIZE
+        self.board = board if board else [[0]*self.size for _ in range(self.size)]
+        self.neighbors, self.diagonals, self.zobrist, self.ring, empty_codes = geometry(self.size)
+        self.points = range(self.size * self.size)
+        n = self.size * self.size
+        self.colors = [self.board[p // self.size][p % self.size] for p in range(n)]
+        self.parent = list(range(n))
+        self.stones = [None] * n # root -> list of points
+        self.libs = [None] * n # root -> set of empty points
+        self.history = [] # One journal per move, for undo()
+        self.journal = None
+        self.hash = 0
+        for p in range(n): self.hash ^= self.zobrist[p][self.colors[p]]
+        self.hashes = [self.hash] # Position hash after each move, for undo()
+        self.codes = empty_codes[:] # 3x3 pattern code per point (go_patterns)
+        for p in range(n):
+            if self.colors[p]: self.shift_codes(p, self.colors[p])
+
+        for p in range(n):
+            if self.colors[p]:
+                self.stones[p] = [p]
+                self.libs[p] = {q for q in self.neighbors[p] if not self.colors[q]}
+        for p in range(n):
+            if self.colors[p]:
+                for q in self.neighbors[p]:
+                    if self.colors[q] == self.colors[p]: self.union(p, q)
+
+    # --- 1. GROUPS ---
+    def find(self, p):
+        parent = self.parent
+        while parent[p] != p: p = parent[p]
+        return p
+
+    def set(self, array, i, value):
+        if self.journal is not None: self.journal.append((array, i, array[i]))
+        array[i] = value
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b: return a
+        # Smaller group hangs under the larger one
+        if len(self.stones[a]) < len(self.stones[b]): a, b = b, a
+        self.set(self.parent, b, a)
+        self.set(self.stones, a, self.stones[a] + self.stones[b])
+        self.set(self.libs, a, self.libs[a] | self.libs[b])
+        return a
+
+    def place(self, p, color):
+        self.hash ^= self.zobrist[p][self.colors[p]] ^ self.zobrist[p][color]
+        self.shift_codes(p, color - self.colors[p])
+        self.set(self.colors, p, color)
+        self.set(self.board[p // self.size], p % self.size, color)
+
+    def shift_codes(self, p, delta):
+        # p changed colour by `delta`: fix the pattern codes around it.
+        # Not journaled; rollback() replays it from the colour changes.
+        codes = self.codes
+        for q, shift in self.ring[p]: codes[q] += delta << shift
+
+    def prior(self, p, color):
+        return PRIORS[color][self.codes[p]]
 
     def get_liberties(self, r, c, color):
-        # Flood fill to find the group and its liberties
-        stack = [(r, c)]
-        visited = set()
-        visited.add((r, c))
-        liberties = set()
-        group = set()
-        group.add((r, c))
-        
-        while stack:
-            curr_r, curr_c = stack.pop()
-            
-            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nr, nc = curr_r + dr, curr_c + dc
-                if 0 <= nr < SIZE and 0 <= nc < SIZE:
-                    if self.board[nr][nc] == 0:
-                        liberties.add((nr, nc))
-                    elif self.board[nr][nc] == color and (nr, nc) not in visited:
-                        visited.add((nr, nc))
-                        group.add((nr, nc))
-                        stack.append((nr, nc))
-        
-        return liberties, group
+        # Returns (liberties, group) as sets of (r, c), like the old flood fill
+        p = r * self.size + c
+        if self.colors[p] != color: return set(), set()
+        root = self.find(p)
+        return ({divmod(q, self.size) for q in self.libs[root]},
+                {divmod(q, self.size) for q in self.stones[root]})
+
+    def liberty_count(self, r, c):
+        p = r * self.size + c
+        return len(self.libs[self.find(p)]) if self.colors[p] else 0
 
+    # --- 2. MOVES ---
     def make_move(self, r, c, color):
-        # 1. Place stone
-        self.board[r][c] = color
-        opponent = 1 if color == 2 else 2
-        captured = []
+        # Off-board points are illegal, not wrapped onto the next row
+        if not (0 <= r < self.size and 0 <= c < self.size): return False, []
+        valid, captured = self.play(r * self.size + c, color)
+        return valid, [divmod(q, self.size) for q in captured]
 
-        # 2. Check for captures of opponent
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < SIZE and 0 <= nc < SIZE and self.board[nr][nc] == opponent:
-                libs, group = self.get_liberties(nr, nc, opponent)
-                if len(libs) == 0:
-                    captured.extend(list(group))
+    def play(self, p, color):
+        # make_move on a flat point; captured stones come back flat too
+        if self.colors[p] or not self.is_legal(p, color): return False, []
+        self.journal = []
 
-        # 3. Remove captured stones
-        for cr, cc in captured:
-            self.board[cr][cc] = 0
+        # 1. Place stone as a new one-stone group
+        self.place(p, color)
+        self.set(self.parent, p, p)
+        self.set(self.stones, p, [p])
+        self.set(self.libs, p, {q for q in self.neighbors[p] if not self.colors[q]})
 
-        # 4. Check suicide (if no liberties and no captures made)
-        libs, _ = self.get_liberties(r, c, color)
-        if len(libs) == 0 and len(captured) == 0:
-            self.board[r][c] = 0 # Undo
-            return False, []
+        # 2. The point is no longer a liberty of any neighbouring group
+        friends, enemies = [], []
+        for q in self.neighbors[p]:
+            if not self.colors[q]: continue
+            root = self.find(q)
+            if root in friends or root in enemies: continue
+            (friends if self.colors[q] == color else enemies).append(root)
+            self.set(self.libs, root, self.libs[root] - {p})
+
+        root = p
+        for friend in friends: root = self.union(root, friend)
+
+        # 3. Capture opponent groups left without liberties
+        captured = []
+        for enemy in enemies:
+            if not self.libs[enemy]: captured.extend(self.remove_group(enemy))
 
+        self.history.append(self.journal)
+        self.hashes.append(self.hash)
+        self.journal = None
         return True, captured
 
-def get_bot_move(board_state):
-    # board_state is List[List[int]]
-    game = GoBoard(board_state)
-    
-    # 1. Try to capture
-    possible_moves = []
-    for r in range(SIZE):
-        for c in range(SIZE):
-            if game.board[r][c] == 0:
-                # Simulate move
-                test_game = GoBoard(copy.deepcopy(game.board))
-                valid, captured = test_game.make_move(r, c, 2) # Bot is 2
+    def is_legal(self, p, color):
+        # Not suicide: an empty neighbour, a friendly group with another
+        # liberty, or an enemy group this stone captures
+        colors = self.colors
+        for q in self.neighbors[p]:
+            c = colors[q]
+            if c == 0: return True
+            if (c == color) == (len(self.libs[self.find(q)]) > 1): return True
+        return False
+
+    def remove_group(self, root):
+        stones = self.stones[root]
+        for s in stones: self.place(s, 0)
+        # Each removed stone becomes a liberty of the groups around it
+        for s in stones:
+            for q in self.neighbors[s]:
+                if self.colors[q]:
+                    other = self.find(q)
+                    if s not in self.libs[other]:
+                        self.set(self.libs, other, self.libs[other] | {s})
+        return stones
+
+    def undo(self):
+        self.rollback(self.history.pop())
+        self.hashes.pop()
+        self.hash = self.hashes[-1]
+
+    def repeats(self, p, color, seen):
+        # Positional superko: would playing p recreate a position in `seen`?
+        valid, _ = self.play(p, color)
+        if not valid: return False
+        repeated = self.hash in seen
+        self.undo()
+        return repeated
+
+    def rollback(self, journal):
+        colors = self.colors
+        for array, i, old in reversed(journal):
+            if array is colors: self.shift_codes(i, old - colors[i])
+            array[i] = old
+
+# --- 3. PLAYOUTS ---
+KOMI = 7.5 # White (the bot) moves second
+MAX_PLAYOUT_MOVES = 3 # Per point; guards against endless ko fights
+
+def is_eye(game, p, color):
+    # Every neighbour ours, and the diagonals don't let the opponent in:
+    # at most one enemy diagonal in the middle, none on the edge
+    colors = game.colors
+    neighbors = game.neighbors[p]
+    for q in neighbors:
+        if colors[q] != color: return False
+    enemy = 3 - color
+    bad = 0
+    for q in game.diagonals[p]:
+        if colors[q] == enemy: bad += 1
+    return bad == 0 if len(neighbors) < 4 else bad <= 1
+
+def ko_point(game, p, captured):
+    # Simple ko: a lone stone that took exactly one stone and is now in
+    # atari can't be recaptured at once
+    if len(captured) == 1:
+        root = game.find(p)
+        if len(game.stones[root]) == 1 and len(game.libs[root]) == 1: return captured[0]
+    return None
+
+def random_move(game, color, ko, rng):
+    # Plays a random legal move that doesn't fill one of our own eyes.
+    # Returns (point, captured), or (None, []) when the only option is to pass.
+    colors = game.colors
+    empties = [p for p in game.points if not colors[p]]
+    n = len(empties)
+    while n:
+        i = int(rng.random() * n)
+        p = empties[i]
+        n -= 1
+        empties[i] = empties[n]
+        if p == ko or is_eye(game, p, color): continue
+        valid, captured = game.play(p, color)
+        if valid: return p, captured
+    return None, []
+
+def playout(game, color, ko, rng):
+    # Random game until both sides pass; returns the winner's colour
+    passes = moves = 0
+    max_moves = MAX_PLAYOUT_MOVES * len(game.colors)
+    while passes < 2 and moves < max_moves:
+        p, captured = random_move(game, color, ko, rng)
+        if p is None: passes, ko = passes + 1, None
+        else: passes, ko = 0, ko_point(game, p, captured)
+        color = 3 - color
+        moves += 1
+    return playout_winner(game)
+
+def playout_winner(game):
+    black, white, _ = area_score(game)
+    return 1 if black > white else 2
+
+# --- 4. MONTE CARLO TREE SEARCH ---
+UCT_C = 1.0
+PRIOR_VISITS = 5 # Virtual playouts a new node's shape prior is worth
+DEFAULT_PLAYOUTS = 1000
+TREE_CACHE_SIZE = 64
+
+class Node:
+    __slots__ = ("move", "color", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, color, parent=None):
+        self.move = move # Flat point played to reach this node
+        self.color = color # Who played it; wins are counted for this colour
+        self.parent = parent
+        self.children = []
+        self.untried = None # Candidate points, filled on the first visit
+        self.visits = 0
+        self.wins = 0
+
+class MCTS:
+    # UCT over a GoBoard: every iteration walks the tree, adds one node,
+    # finishes the game with a light playout and backs the result up.
+    # Moves are undone afterwards, so the board is never copied.
+    def __init__(self, root=None, seed=None):
+        self.root = root or Node(None, 1) # Black just moved, White to play
+        self.rng = random.Random(seed)
+        self.playouts = 0
+
+    def run(self, game, playouts, max_ms=None):
+        deadline = time.perf_counter() + max_ms / 1000 if max_ms else None
+        base = len(game.history)
+        for _ in range(playouts):
+            if deadline and time.perf_counter() > deadline: break
+            node, ko = self.root, None
+
+            # 1. Selection
+            while node.untried == [] and node.children:
+                node = self.select(node)
+                _, captured = game.play(node.move, node.color)
+                ko = ko_point(game, node.move, captured)
+
+            # 2. Expansion
+            color = 3 - node.color
+            if node.untried is None:
+                untried = [p for p in game.points if not game.colors[p] and p != ko and not is_eye(game, p, color)]
+                # Best 3x3 shapes are expanded first (popped off the end)
+                self.rng.shuffle(untried)
+                untried.sort(key=lambda p: game.prior(p, color))
+                node.untried = untried
+            while node.untried:
+                p = node.untried.pop()
+                prior = game.prior(p, color)
+                valid, captured = game.play(p, color)
                 if valid:
-                    score = len(captured) * 10
-                    # Heuristic: Prefer center/corners slightly
-                    if 2 <= r <= 6 and 2 <= c <= 6: score += 1
-                    possible_moves.append({"r": r, "c": c, "score": score})
-    
-    if not possible_moves: return None
-    
-    # Sort by best score
-    possible_moves.sort(key=lambda x: x['score'], reverse=True)
-    
-    # Pick one of the best (add randomness to avoid loops)
-    best_score = possible_moves[0]['score']
-    candidates = [m for m in possible_moves if m['score'] == best_score]
-    choice = random.choice(candidates)
-    
-    return {"r": choice['r'], "c": choice['c']}
\ No newline at end of file
+                    node = Node(p, color, node)
+                    node.parent.children.append(node)
+                    # The prior starts the node off as a few virtual playouts
+                    node.visits = PRIOR_VISITS
+                    node.wins = PRIOR_VISITS * prior / (prior + NEUTRAL)
+                    ko, color = ko_point(game, p, captured), 3 - color
+                    break
+
+            # 3. Playout
+            winner = playout(game, color, ko, self.rng)
+
+            # 4. Backpropagation
+            while node is not None:
+                node.visits += 1
+                if winner == node.color: node.wins += 1
+                node = node.parent
+            while len(game.history) > base: game.undo()
+            self.playouts += 1
+
+    def select(self, node):
+        log_n = math.log(node.visits)
+        return max(node.children, key=lambda ch: ch.wins / ch.visits + UCT_C * math.sqrt(log_n / ch.visits))
+
+# Tree reuse: after answering, the subtrees under each explored reply are
+# kept by position, so the next request (our move + their reply) starts
+# from the playouts already spent on it.
+_trees = OrderedDict()
+_trees_lock = threading.Lock()
+
+def remember_replies(game, child):
+    game.play(child.move, child.color)
+    with _trees_lock:
+        for reply in child.children:
+            game.play(reply.move, reply.color)
+            reply.parent = None
+            _trees[game.size, game.hash] = reply
+            _trees.move_to_end((game.size, game.hash))
+            game.undo()
+        while len(_trees) > TREE_CACHE_SIZE: _trees.popitem(last=False)
+    game.undo()
+
+def reused_tree(game):
+    with _trees_lock:
+        return _trees.pop((game.size, game.hash), None)
+
+# --- 5. PARALLEL PLAYOUTS ---
+# Root parallelisation: each worker process grows its own tree over a
+# share of the playouts and the root visit counts are summed.
+# GO_WORKERS <= 1 keeps the single-process search (with tree reuse).
+WORKERS = int(os.getenv("GO_WORKERS", "1"))
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock() # Requests run on threadpool threads
+
+def get_pool(workers):
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != workers:
+            if _pool is not None: _pool.shutdown(wait=False)
+            _pool, _pool_size = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+def search_worker(board_state, playouts, max_ms, seed):
+    # Runs inside a worker process
+    mcts = MCTS(seed=seed)
+    mcts.run(GoBoard(board_state), playouts, max_ms)
+    return {child.move: child.visits for child in mcts.root.children}
+
+def parallel_visits(board_state, playouts, max_ms=None, workers=None, seed=None):
+    # Returns {point: visits}, or None if the pool can't be used
+    workers = workers or WORKERS
+    if workers <= 1: return None
+    share = -(-playouts // workers)
+    if seed is None: seed = random.getrandbits(32)
+    try:
+        pool = get_pool(workers)
+        futures = [pool.submit(search_worker, board_state, share, max_ms, seed + i) for i in range(workers)]
+        results = [f.result() for f in futures]
+    except (BrokenProcessPool, OSError):
+        return None
+    visits = Counter()
+    for result in results: visits.update(result)
+    return visits
+
+def get_bot_move(board_state, playouts=None, max_ms=None, workers=None, seen=None, seed=None):
+    # board_state is List[List[int]]; the bot plays White (2).
+    # Stops after `playouts` playouts or `max_ms`, whichever comes first.
+    # `seen` holds the hashes of earlier positions (positional superko);
+    # playouts only know simple ko, so the answer is checked against it.
+    # A fixed seed (and no max_ms) makes the answer repeatable.
+    playouts = playouts or DEFAULT_PLAYOUTS
+    game = GoBoard(board_state)
+    visits = parallel_visits(board_state, playouts, max_ms, workers, seed)
+    mcts = None
+    if visits is None:
+        mcts = MCTS(reused_tree(game), seed)
+        mcts.run(game, playouts, max_ms)
+        visits = {child.move: child.visits for child in mcts.root.children}
+
+    legal = [p for p in visits if not (seen and game.repeats(p, 2, seen))]
+    if not legal: return None
+    move = max(legal, key=visits.get)
+    if mcts: remember_replies(game, next(ch for ch in mcts.root.children if ch.move == move))
+
+    r, c = divmod(move, game.size)
+    return {"r": r, "c": c}
+
+def greedy_move(board_state, seen=None):
+    # One-ply heuristic: capture the most stones, else play near the centre.
+    # Every point is scored in one batched pass over the array board.
+    scores = score_moves(to_array(board_state), 2) # Bot is 2
+    game = GoBoard(board_state) if seen else None
+    while scores.max() >= 0:
+        # Pick one of the best (add randomness to avoid loops)
+        r, c = random.choice(np.argwhere(scores == scores.max()).tolist())
+        if not (game and game.repeats(r * game.size + c, 2, seen)): return {"r": r, "c": c}
+        scores[r, c] = -1 # Would repeat an earlier position (superko)
+    return None
+
+BOTS = ("mcts", "greedy") # greedy: one batched pass, for fast or weak play
+
+def choose_move(board_state, bot="mcts", playouts=None, max_ms=None, seen=None):
+    if bot == "greedy": return greedy_move(board_state, seen)
+    return get_bot_move(board_state, playouts, max_ms, seen=seen)
+
+# --- 6. SCORING ---
+OWNERSHIP_PLAYOUTS = 64
+
+def area_score(game, komi=KOMI):
+    # Tromp-Taylor: each side's stones plus the empty regions that reach
+    # only that colour. Returns (black, white + komi, owner) where owner[p]
+    # is 1, 2 or 0 for neutral points.
+    colors, neighbors = game.colors, game.neighbors
+    owner = colors[:]
+    visited = [False] * len(colors)
+    for p in game.points:
+        if colors[p] or visited[p]: continue
+        # Flood fill the empty region, noting which colours border it
+        region, reaches = [p], 0
+        visited[p] = True
+        for q in region:
+            for nq in neighbors[q]:
+                color = colors[nq]
+                if color: reaches |= color
+                elif not visited[nq]:
+                    visited[nq] = True
+                    region.append(nq)
+        if reaches == 1 or reaches == 2:
+            for q in region: owner[q] = reaches
+    return owner.count(1), owner.count(2) + komi, owner
+
+def ownership(game, color=1, playouts=OWNERSHIP_PLAYOUTS, max_ms=None, seed=None):
+    # Average final owner of each point over light playouts with `color`
+    # to move: +1 always Black, -1 always White. Returns rows of floats.
+    deadline = time.perf_counter() + max_ms / 1000 if max_ms else None
+    rng = random.Random(seed)
+    totals = [0] * len(game.colors)
+    base, done = len(game.history), 0
+    for _ in range(playouts):
+        if deadline and time.perf_counter() > deadline: break
+        playout(game, color, None, rng)
+        _, _, owner = area_score(game)
+        for p, o in enumerate(owner):
+            if o == 1: totals[p] += 1
+            elif o == 2: totals[p] -= 1
+        while len(game.history) > base: game.undo()
+        done += 1
+    size = game.size
+    return [[round(totals[r * size + c] / max(done, 1), 2) for c in range(size)] for r in range(size)]
+
@@ -0,0 +1,130 @@
+# backend/app/go_bench.py
+# Go engine benchmark: bot-vs-bot self-play at fixed seeds and board sizes.
+# Reports moves/sec, per-move latency percentiles, board call counts
+# (make_move, play, get_liberties) and, for the MCTS bot, playouts/sec.
+#
+# Usage:
+#   python -m app.go_bench                         # run, compare to baseline
+#   python -m app.go_bench --save-baseline         # run, store as baseline
+#   python -m app.go_bench --sizes 9 13 19 --bots mcts --playouts 300
+#   python -m app.go_bench --out results.json --tolerance 0.2
+import argparse
+import random
+import time
+from contextlib import contextmanager
+from . import go_ai
+from .bench import add_baseline_args, dropped, finish, grew, latency
+from .go_ai import GoBoard, area_score, greedy_move, get_bot_move
+
+SEEDS = [1, 2, 3, 4, 5, 6, 7, 8]
+COUNTED = ("make_move", "play", "get_liberties")
+
+# --- 1. INSTRUMENTATION ---
+@contextmanager
+def counting():
+    # Counts board method calls and playouts while the block runs
+    counts = dict.fromkeys(COUNTED + ("playouts",), 0)
+    originals = {name: getattr(GoBoard, name) for name in COUNTED}
+    original_playout = go_ai.playout
+
+    def counted(name, fn):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    for name, fn in originals.items(): setattr(GoBoard, name, counted(name, fn))
+    go_ai.playout = counted("playouts", original_playout)
+    try:
+        yield counts
+    finally:
+        for name, fn in originals.items(): setattr(GoBoard, name, fn)
+        go_ai.playout = original_playout
+
+# --- 2. SELF-PLAY ---
+def bot_move(bot, board, color, playouts, seed):
+    # Both bots play White (2): Black sees the board with colours swapped
+    if color == 1: board = [[3 - x if x else 0 for x in row] for row in board]
+    else: board = [row[:] for row in board]
+    if bot == "greedy": return greedy_move(board)
+    return get_bot_move(board, playouts, workers=1, seed=seed)
+
+def play_game(bot, size, seed, playouts):
+    random.seed(seed)
+    go_ai._trees.clear() # No tree reuse across games
+    game = GoBoard(size=size)
+    latencies, passes, color = [], 0, 1
+    for ply in range(2 * size * size):
+        start = time.perf_counter()
+        move = bot_move(bot, game.board, color, playouts, seed * 1000 + ply)
+        latencies.append(time.perf_counter() - start)
+        if move and game.make_move(move['r'], move['c'], color)[0]: passes = 0
+        else: passes += 1
+        if passes >= 2: break
+        color = 3 - color
+    black, white, _ = area_score(game)
+    return latencies, 1 if black > white else 2
+
+def run_config(bot, size, games, playouts):
+    latencies, winners = [], []
+    with counting() as counts:
+        start = time.perf_counter()
+        for seed in SEEDS[:games]:
+            game_latencies, winner = play_game(bot, size, seed, playouts)
+            latencies += game_latencies
+            winners.append(winner)
+        elapsed = time.perf_counter() - start
+    ms = [l * 1000 for l in latencies]
+    row = {
+        "bot": bot, "size": size, "games": games, "moves": len(ms),
+        "moves_per_sec": round(len(ms) / elapsed, 2) if elapsed > 0 else 0,
+        "latency_ms": latency(ms),
+        "calls": {name: counts[name] for name in COUNTED},
+        "black_wins": winners.count(1),
+        "time_s": round(elapsed, 2),
+    }
+    if bot == "mcts":
+        row["playouts"] = counts["playouts"]
+        row["playouts_per_sec"] = int(counts["playouts"] / elapsed) if elapsed > 0 else 0
+    return row
+
+def run_benchmark(bots=("greedy", "mcts"), sizes=(9,), games=2, playouts=100):
+    return {
+        "config": {"bots": list(bots), "sizes": list(sizes), "games": games, "playouts": playouts},
+        "results": [run_config(bot, size, games, playouts) for bot in bots for size in sizes],
+    }
+
+# --- 3. BASELINE COMPARISON ---
+def compare(result, baseline, tolerance):
+    # Returns a list of regressions: throughput may not drop, and p90
+    # latency may not grow, by more than `tolerance` (a fraction). Changed
+    # call counts are reported too: at fixed seeds they mean the games
+    # themselves changed.
+    problems = []
+    old_rows = {(r["bot"], r["size"]): r for r in baseline["results"]}
+    for row in result["results"]:
+        old = old_rows.get((row["bot"], row["size"]))
+        if not old: continue
+        label = f"{row['bot']} {row['size']}x{row['size']}"
+        for field in ("moves_per_sec", "playouts_per_sec"):
+            if old.get(field): problems.append(dropped(f"{label} {field}", row[field], old[field], tolerance))
+        problems.append(grew(f"{label} p90 latency", row["latency_ms"]["p90"], old["latency_ms"]["p90"], tolerance, " ms"))
+        if row["calls"] != old["calls"]:
+            problems.append(f"{label} call counts changed: {old['calls']} -> {row['calls']}")
+    return [p for p in problems if p]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Go engine self-play benchmark")
+    parser.add_argument("--bots", nargs="+", choices=("greedy", "mcts"), default=["greedy", "mcts"])
+    parser.add_argument("--sizes", nargs="+", type=int, choices=go_ai.SIZES, default=[9])
+    parser.add_argument("--games", type=int, default=2, help=f"Games per bot and size (max {len(SEEDS)})")
+    parser.add_argument("--playouts", type=int, default=100, help="MCTS playouts per move")
+    add_baseline_args(parser, "go_bench")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.bots, args.sizes, min(args.games, len(SEEDS)), args.playouts)
+    for row in result["results"]:
+        extra = f" {row['playouts_per_sec']:>6} playouts/s" if "playouts" in row else ""
+        print(f"{row['bot']:<6} {row['size']:>2}x{row['size']:<2} {row['moves']:>5} moves {row['moves_per_sec']:>9} moves/s "
+              f"p50 {row['latency_ms']['p50']:>8} ms p90 {row['latency_ms']['p90']:>8} ms{extra}  {row['calls']}")
+    finish(result, args, compare)
@@ -0,0 +1,100 @@
+# backend/app/go_patterns.py
+# 3x3 shape priors for the Go bots. A point's neighbourhood is its eight
+# surrounding points, 2 bits each (0 empty, 1 Black, 2 White, 3 off the
+# board) in RING order, so every 3x3 pattern is an integer below 65536.
+# The table holds one weight byte per pattern and side to move, built
+# offline from a few shape rules tried in all 8 orientations: 16 is
+# neutral, higher is a better-looking move. 2 * 64 KB.
+#
+# Regenerate with: python -m app.go_patterns
+import os
+
+PATTERN_PATH = os.path.join(os.path.dirname(__file__), "data", "go_patterns.bin")
+CODES = 1 << 16
+NEUTRAL = 16
+EDGE = 3
+
+# (row, col) offsets of the ring, least significant 2 bits first
+RING = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+# --- 1. LOOKUP ---
+def load_patterns():
+    if not os.path.exists(PATTERN_PATH): return None
+    with open(PATTERN_PATH, "rb") as f: data = f.read()
+    # A truncated or line-ending-converted file would load shifted priors
+    if len(data) != 2 * CODES:
+        raise ValueError(f"{PATTERN_PATH} is {len(data)} bytes, expected {2 * CODES} (regenerate with python -m app.go_patterns)")
+    return data[:CODES], data[CODES:]
+
+_tables = load_patterns()
+# PRIORS[color][code]: weight of playing `color` at a point with that ring
+PRIORS = (None, _tables[0], _tables[1]) if _tables else (None, bytes([NEUTRAL]) * CODES, bytes([NEUTRAL]) * CODES)
+
+# --- 2. GENERATOR ---
+SYMMETRIES = [
+    lambda r, c: (r, c), lambda r, c: (-r, c), lambda r, c: (r, -c), lambda r, c: (-r, -c),
+    lambda r, c: (c, r), lambda r, c: (-c, r), lambda r, c: (c, -r), lambda r, c: (-c, -r),
+]
+
+def decode(code):
+    return {RING[k]: (code >> (2 * k)) & 3 for k in range(8)}
+
+def multiplier(ring):
+    # Rules are written for Black (1) to move at the centre, with
+    # N = (-1, 0) and W = (0, -1); each is tried in all orientations
+    me, opp = 1, 2
+    orthogonal = [ring[(-1, 0)], ring[(1, 0)], ring[(0, -1)], ring[(0, 1)]]
+    stones = [v for v in ring.values() if v in (me, opp)]
+
+    # Filling our own eye is almost never right
+    if all(v in (me, EDGE) for v in orthogonal):
+        enemy_diagonals = sum(1 for k in ((-1, -1), (-1, 1), (1, -1), (1, 1)) if ring[k] == opp)
+        edge = EDGE in orthogonal
+        if enemy_diagonals == 0 or (enemy_diagonals == 1 and not edge): return 0.05
+
+    # Empty first line and corner points are slow
+    edges = sum(1 for v in orthogonal if v == EDGE)
+    if not stones and edges: return 0.3 if edges == 1 else 0.15
+
+    mult = 1.0
+    if opp in orthogonal: mult *= 1.5 # Contact play
+    seen = set()
+    for transform in SYMMETRIES:
+        at = lambda r, c: ring[transform(r, c)]
+        n, w, nw, ne = at(-1, 0), at(0, -1), at(-1, -1), at(-1, 1)
+        # Cut: two enemy stones meeting diagonally through our point
+        if n == opp and w == opp and nw not in (opp, EDGE) and "cut" not in seen:
+            seen.add("cut"); mult *= 3
+        # Connect: mend our own cutting point
+        if n == me and w == me and nw == opp and "connect" not in seen:
+            seen.add("connect"); mult *= 3
+        # Hane: reach around the head of an enemy stone
+        if n == opp and nw == me and w == 0 and "hane" not in seen:
+            seen.add("hane"); mult *= 2
+        # Empty triangle: clumsy shape when nothing is being fought over
+        if n == me and w == me and nw == 0 and opp not in stones and "triangle" not in seen:
+            seen.add("triangle"); mult *= 0.5
+        # Diagonal extension from our stone towards empty space
+        if ne == me and n == 0 and at(0, 1) == 0 and not any(v == opp for v in orthogonal) and "diagonal" not in seen:
+            seen.add("diagonal"); mult *= 1.2
+    return mult
+
+def swap_colors(code):
+    out = 0
+    for k in range(8):
+        v = (code >> (2 * k)) & 3
+        out |= (3 - v if v in (1, 2) else v) << (2 * k)
+    return out
+
+def generate():
+    black = bytearray(CODES)
+    for code in range(CODES):
+        black[code] = max(1, min(255, round(NEUTRAL * multiplier(decode(code)))))
+    white = bytearray(black[swap_colors(code)] for code in range(CODES))
+    return bytes(black) + bytes(white)
+
+if __name__ == "__main__":
+    os.makedirs(os.path.dirname(PATTERN_PATH), exist_ok=True)
+    data = generate()
+    with open(PATTERN_PATH, "wb") as f: f.write(data)
+    print(f"{len(data)} bytes, {sum(1 for v in data[:CODES] if v != NEUTRAL)} non-neutral patterns")
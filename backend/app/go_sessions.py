@@ -0,0 +1,107 @@
+# backend/app/go_sessions.py
+# Server-held Go games. The board, its groups and the hash of every
+# position so far stay on the server, so a move request is just (row, col)
+# and a move that recreates an earlier position (positional superko) is
+# rejected. Replies only carry the points that changed.
+import threading
+import time
+import uuid
+from .go_ai import GoBoard, SIZE, area_score, choose_move, ownership
+
+MAX_SESSIONS = 1000
+SESSION_TTL = 3600 # Seconds an idle game is kept
+
+class GoSession:
+    def __init__(self, size=SIZE):
+        self.id = uuid.uuid4().hex
+        self.game = GoBoard(size=size)
+        self.seen = {self.game.hash} # Every position so far, for superko
+        self.captures = {1: 0, 2: 0}
+        self.moves = 0
+        self.last_active = time.time()
+        self.lock = threading.Lock()
+        self.estimate = (None, None) # (position hash, ownership) so polling is free
+
+    def play(self, r, c, color):
+        # Returns (error, changes); changes are [r, c, color] per point
+        size = self.game.size
+        if not (0 <= r < size and 0 <= c < size): return "Off the board", []
+        valid, captured = self.game.make_move(r, c, color)
+        if not valid: return "Illegal move", []
+        if self.game.hash in self.seen:
+            self.game.undo()
+            return "Repeats an earlier position (superko)", []
+        self.seen.add(self.game.hash)
+        self.captures[color] += len(captured)
+        self.moves += 1
+        return None, [[r, c, color]] + [[cr, cc, 0] for cr, cc in captured]
+
+    def player_move(self, r, c, playouts=None, max_ms=None, bot="mcts"):
+        with self.lock:
+            self.last_active = time.time()
+            error, changes = self.play(r, c, 1) # Player is 1 (Black/Cyan)
+            if error: return {"valid": False, "error": error}
+            captured_by_player = len(changes) - 1
+
+            # Bot responds; None means it passes. It searches on a copy, so
+            # snapshot() never sees a board from the middle of a playout.
+            bot_move = choose_move([row[:] for row in self.game.board], bot, playouts, max_ms, self.seen)
+            captured_by_bot = 0
+            if bot_move:
+                _, bot_changes = self.play(bot_move['r'], bot_move['c'], 2) # Bot is 2 (White/Yellow)
+                captured_by_bot = len(bot_changes) - 1
+                changes += bot_changes
+
+            return {
+                "valid": True,
+                "changes": merge_changes(changes),
+                "captured_by_player": captured_by_player,
+                "captured_by_bot": captured_by_bot,
+                "bot_move": bot_move,
+            }
+
+    def score(self):
+        black, white, _ = area_score(self.game)
+        return {"black": black, "white": white, "winner": 1 if black > white else 2}
+
+    def ownership(self, max_ms):
+        # Recomputed only when the position changed since the last poll
+        with self.lock:
+            position, estimate = self.estimate
+            if position != self.game.hash:
+                # Playouts run on a copy: score() and snapshot() don't lock
+                copy = GoBoard([row[:] for row in self.game.board])
+                estimate = ownership(copy, 1, max_ms=max_ms) # Player to move
+                self.estimate = (self.game.hash, estimate)
+            return {"ownership": estimate, "score": self.score()}
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "size": self.game.size,
+            "board": [row[:] for row in self.game.board],
+            "moves": self.moves,
+            "captures": self.captures,
+        }
+
+def merge_changes(changes):
+    # A point touched twice in one reply (e.g. captured, then replayed)
+    # is sent once with its final colour
+    final = {}
+    for r, c, color in changes: final[(r, c)] = color
+    return [[r, c, color] for (r, c), color in final.items()]
+
+# --- SESSION REGISTRY ---
+sessions = {} # session id -> GoSession
+
+def create_session(size=SIZE):
+    prune_sessions()
+    if len(sessions) >= MAX_SESSIONS: raise RuntimeError("Too many Go games in progress")
+    session = GoSession(size)
+    sessions[session.id] = session
+    return session
+
+def prune_sessions():
+    now = time.time()
+    for session_id in [s.id for s in sessions.values() if now - s.last_active > SESSION_TTL]:
+        del sessions[session_id]
@@ -1,8 +1,22 @@
 # backend/app/poker_ai.py
-from treys import Card, Evaluator, Deck
+from treys import Card, Deck
 import random
+from .poker_equity import estimate_equity
+from .poker_eval import class_names, evaluate, parse_hand
+from .poker_preflop import preflop_equity
+from .poker_range import range_equity
 
-evaluator = Evaluator()
+BOT_EQUITY_MS = 50 # Time the bot may spend sampling per decision
+BETTING_RANGE = "50%" # Hands we assume a player bets or raises with
+
+# Decision thresholds (heads-up equity), also played by poker_sim's "bot"
+# policy so offline tuning tunes this bot
+PREFLOP_RAISE = 0.6 # Premium starting hand
+PREFLOP_CALL = 0.5 # Playable
+PREFLOP_BLUFF = 0.2 # Chance of raising any other starting hand
+RAISE_EQUITY = 0.7 # Post-flop: strong hand
+CALL_EQUITY = 0.4 # Post-flop: decent hand
+BLUFF_CALL = 0.1 # Chance of calling a bet with a weak hand
 
 # --- 1. CARD UTILS ---
 def pretty_card(int_card):
@@ -18,53 +32,50 @@ def get_suit_int(int_card):
 def bot_decision(bot_hand_ints, community_ints, current_bet, bot_chips, pot_size, stage):
     # If we have no community cards (Pre-flop), play tight-aggressive
     if not community_ints:
-        # Simple high card logic
-        ranks = [Card.get_rank_int(c) for c in bot_hand_ints]
-        high_card = max(ranks)
-        if high_card >= 10 or (ranks[0] == ranks[1]): # Pair or high card
+        # Heads-up equity of the starting hand, from the precomputed table
+        equity = preflop_equity(bot_hand_ints, opponents=1)
+        if equity > PREFLOP_RAISE: # Premium hand
+            return "raise" if current_bet < bot_chips else "all-in"
+        if equity > PREFLOP_CALL: # Playable
             return "call" if current_bet <= bot_chips else "all-in"
         else:
             # Bluff chance
-            return "raise" if random.random() < 0.2 else "call" # Passive pre-flop
+            return "raise" if random.random() < PREFLOP_BLUFF else "call" # Passive pre-flop
 
-    # Post-flop: Calculate Hand Strength
-    # 0 = Best (Royal Flush), 7462 = Worst
-    score = evaluator.evaluate(community_ints, bot_hand_ints)
-    percentile = 1.0 - (score / 7462.0) # 1.0 is best, 0.0 is worst
+    # Post-flop: Monte Carlo equity against a random hand, sampling the
+    # opponent's cards and the rest of the board. Facing a bet, weigh the
+    # hand against the range a player bets with instead.
+    if current_bet > 0:
+        hand = "".join(Card.int_to_str(c) for c in bot_hand_ints)
+        board = [Card.int_to_str(c) for c in community_ints]
+        equity = range_equity([hand, BETTING_RANGE], board, max_ms=BOT_EQUITY_MS)["equities"][0]
+    else:
+        equity, _ = estimate_equity(bot_hand_ints, community_ints, opponents=1, max_ms=BOT_EQUITY_MS)
 
-    # Decision Logic based on Hand Strength
-    if percent_to_win(percentile) > 0.7:
+    # Decision Logic based on Equity
+    if equity > RAISE_EQUITY:
         return "raise" # Strong hand
-    elif percent_to_win(percentile) > 0.4:
+    elif equity > CALL_EQUITY:
         return "call"  # Decent hand
     else:
         # Weak hand - Bluff or Fold?
         if current_bet == 0: return "check"
-        return "fold" if random.random() > 0.1 else "call" # 10% bluff call
-
-def percent_to_win(strength):
-    # Rough mapping of strength to win probability
-    return strength ** 2 # Convex curve
+        return "fold" if random.random() > BLUFF_CALL else "call" # Occasional bluff call
 
 # --- 3. GAME STATE MANAGER (Stateless Helper) ---
 # In a real app, we'd use a DB. Here we re-simulate simple states or just evaluate.
 def evaluate_winner(player_hand_strs, bot_hand_strs, board_strs):
-    # Convert string cards (e.g. "Ah", "Td") back to Integers for Treys
-    p_hand = [Card.new(c) for c in player_hand_strs]
-    b_hand = [Card.new(c) for c in bot_hand_strs]
-    board = [Card.new(c) for c in board_strs]
-
-    p_score = evaluator.evaluate(board, p_hand)
-    b_score = evaluator.evaluate(board, b_hand)
-    
-    p_class = evaluator.get_rank_class(p_score)
-    b_class = evaluator.get_rank_class(b_score)
+    # Both hands scored in one lookup-table call (strings like "Ah", "Td")
+    board = parse_hand(board_strs)
+    scores = evaluate([parse_hand(player_hand_strs) + board, parse_hand(bot_hand_strs) + board])
+    p_score, b_score = int(scores[0]), int(scores[1])
+    p_rank, b_rank = class_names(scores)
 
     return {
         "player_score": p_score,
         "bot_score": b_score,
-        "player_rank": evaluator.class_to_string(p_class),
-        "bot_rank": evaluator.class_to_string(b_class),
+        "player_rank": p_rank,
+        "bot_rank": b_rank,
         "winner": "player" if p_score < b_score else "bot" if b_score < p_score else "split"
     }
 
@@ -0,0 +1,99 @@
+# backend/app/poker_equity.py
+# Monte Carlo equity for hold'em: opponent hands and board runouts are
+# sampled in batches as arrays of card indices and scored with the
+# lookup-table evaluator in poker_eval, until the 95% confidence interval
+# is tight enough or the time budget runs out.
+#
+# Cards are indices 0-51 (rank * 4 + suit, rank 0 = deuce) inside this
+# module; scores follow treys (1 = royal flush, 7462 = worst high card).
+import time
+from itertools import combinations
+import numpy as np
+from treys import Card
+from treys.lookup import LookupTable
+from . import poker_eval
+
+SUITS = (1, 2, 4, 8) # treys suit bits for s, h, d, c
+
+def to_index(card):
+    return Card.get_rank_int(card) * 4 + SUITS.index(Card.get_suit_int(card))
+
+def to_treys(index):
+    return Card.new(Card.STR_RANKS[index // 4] + "shdc"[index % 4])
+
+# --- 1. VECTORISED EVALUATOR ---
+# Prime-product lookups over the 21 five-card subsets; only used when
+# poker_eval's tables haven't been built
+PRIMES = np.array([Card.PRIMES[i // 4] for i in range(52)], dtype=np.int64)
+SUIT_BIT = 1 << (np.arange(52) % 4)
+
+def _sorted_table(lookup):
+    keys = np.array(sorted(lookup), dtype=np.int64)
+    return keys, np.array([lookup[k] for k in keys], dtype=np.int16)
+
+_table = LookupTable()
+FLUSH_KEYS, FLUSH_VALUES = _sorted_table(_table.flush_lookup)
+UNSUITED_KEYS, UNSUITED_VALUES = _sorted_table(_table.unsuited_lookup)
+FIVE_OF_SEVEN = np.array(list(combinations(range(7), 5)))
+
+def evaluate_five(cards):
+    # cards: (..., 5) indices -> treys scores. Five cards are identified by
+    # the product of their rank primes, flush or not.
+    product = PRIMES[cards].prod(axis=-1)
+    suits = np.bitwise_or.reduce(SUIT_BIT[cards], axis=-1)
+    flush = (suits & (suits - 1)) == 0 # A single suit bit set
+    # Flush ranks are always five distinct ones, which the unsuited table
+    # also covers (as a straight or high card): overwrite just the flushes
+    values = UNSUITED_VALUES[np.searchsorted(UNSUITED_KEYS, product)]
+    if flush.any(): values[flush] = FLUSH_VALUES[np.searchsorted(FLUSH_KEYS, product[flush])]
+    return values
+
+def evaluate_batch(cards):
+    # cards: (N, 7) indices -> (N,) treys scores, best 5 of the 7
+    if poker_eval.NOFLUSH is not None: return poker_eval.evaluate(cards)
+    return evaluate_five(cards[:, FIVE_OF_SEVEN]).min(axis=1)
+
+# --- 2. MONTE CARLO EQUITY ---
+BATCH = 2000
+MIN_SAMPLES = 2000
+MAX_SAMPLES = 200000
+CI_HALF_WIDTH = 0.01 # Stop once the 95% interval is +/- 1%
+DEFAULT_EQUITY_MS = 50
+
+def estimate_equity(hand, board=(), opponents=1, max_ms=DEFAULT_EQUITY_MS, rng=None,
+                    ci_half_width=CI_HALF_WIDTH, max_samples=MAX_SAMPLES):
+    # hand and board are treys ints. Returns (equity, samples): the share
+    # of the pot won on average against `opponents` random hands.
+    deadline = time.perf_counter() + max_ms / 1000
+    rng = rng or np.random.default_rng()
+    known = np.array([to_index(c) for c in list(hand) + list(board)], dtype=np.int64)
+    deck = np.setdiff1d(np.arange(52), known)
+    missing = 5 - len(board)
+    need = missing + 2 * opponents
+
+    total = total_sq = 0.0
+    samples = 0
+    while samples < max_samples:
+        batch_start = time.perf_counter()
+        # A random subset of the deck per sample: sort random keys per row
+        drawn = deck[rng.random((BATCH, len(deck))).argsort(axis=1)[:, :need]]
+        board_cards = np.hstack([np.broadcast_to(known[2:], (BATCH, len(board))), drawn[:, :missing]])
+        hero = evaluate_batch(np.hstack([np.broadcast_to(known[:2], (BATCH, 2)), board_cards]))
+        villains = np.stack([
+            evaluate_batch(np.hstack([drawn[:, missing + 2 * i:missing + 2 * i + 2], board_cards]))
+            for i in range(opponents)
+        ], axis=1)
+        best = villains.min(axis=1)
+        ties = (villains == hero[:, None]).sum(axis=1)
+        share = np.where(hero < best, 1.0, np.where(hero == best, 1.0 / (1 + ties), 0.0))
+
+        total += share.sum()
+        total_sq += (share * share).sum()
+        samples += BATCH
+        mean = total / samples
+        stderr = np.sqrt(max(total_sq / samples - mean * mean, 0.0) / samples)
+        if samples >= MIN_SAMPLES and 1.96 * stderr < ci_half_width: break
+        # Don't start a batch that would overrun the budget
+        now = time.perf_counter()
+        if now + (now - batch_start) > deadline: break
+    return float(total / samples), samples
@@ -0,0 +1,156 @@
+# backend/app/poker_eval.py
+# Lookup-table hand evaluator for 5 to 7 cards, scoring whole arrays of
+# hands per call. Without a flush a hand's value depends only on its rank
+# multiset, which a perfect hash maps to a dense index (one table per
+# card count); with five or more cards of one suit, the 13-bit mask of
+# that suit's ranks indexes the flush table. Scores follow treys
+# (1 = royal flush, 7462 = worst high card).
+#
+# Cards are indices 0-51 (rank * 4 + suit, rank 0 = deuce).
+# Rebuild the tables with: python -m app.poker_eval
+import os
+import numpy as np
+from treys import Card, Evaluator
+from treys.lookup import LookupTable
+
+EVAL_PATH = os.path.join(os.path.dirname(__file__), "data", "poker_eval.bin")
+RANKS = 13
+MIN_CARDS, MAX_CARDS = 5, 7
+WORST = 7462
+
+CARD_INDEX = {r + s: i * 4 + j for i, r in enumerate(Card.STR_RANKS) for j, s in enumerate("shdc")}
+
+def parse_hand(card_strs):
+    # "Ah" style strings -> indices; raises KeyError on a bad card
+    return [CARD_INDEX[c] for c in card_strs]
+
+# --- 1. PERFECT HASH OVER RANK MULTISETS ---
+# ways[r][k]: multisets of k cards over r ranks, at most 4 of each
+ways = [[0] * (MAX_CARDS + 1) for _ in range(RANKS + 1)]
+ways[0][0] = 1
+for r in range(1, RANKS + 1):
+    for k in range(MAX_CARDS + 1):
+        ways[r][k] = sum(ways[r - 1][k - c] for c in range(min(4, k) + 1))
+
+# OFFSET[r, k, c]: multisets ranked before ours when rank r holds c of the
+# k cards still to place, i.e. those that put fewer cards on rank r
+OFFSET = np.zeros((RANKS, MAX_CARDS + 1, 5), dtype=np.int32)
+for r in range(RANKS):
+    for k in range(MAX_CARDS + 1):
+        for c in range(1, 5):
+            OFFSET[r, k, c] = OFFSET[r, k, c - 1] + (ways[RANKS - 1 - r][k - c + 1] if k - c + 1 >= 0 else 0)
+
+TABLE_SIZES = {n: ways[RANKS][n] for n in range(MIN_CARDS, MAX_CARDS + 1)} # 6175, 18395, 49205
+TABLE_BASE = {}
+_base = 0
+for n in range(MIN_CARDS, MAX_CARDS + 1):
+    TABLE_BASE[n] = _base
+    _base += TABLE_SIZES[n]
+NOFLUSH_SIZE = _base
+FLUSH_SIZE = 1 << RANKS
+
+def multiset_hash(counts):
+    # counts: (N, 13) cards per rank, all rows with the same total n
+    n = int(counts[0].sum())
+    remaining = n - np.cumsum(counts, axis=1) + counts # Cards left before each rank
+    return OFFSET[np.arange(RANKS), remaining, counts].sum(axis=1)
+
+# Counts per rank as a base-5 number are a plain sum over the cards, so
+# the hash is split into two tables by rank half: the low ranks (0-6)
+# indexed by total card count, the high ranks by cards left for them
+SPLIT = 7
+POW5 = 5 ** np.arange(RANKS, dtype=np.int64)
+
+def _half_hashes(first, last):
+    # [k, q]: hash contribution of ranks first..last-1 whose base-5 digits
+    # are q, when k cards are left to place at rank `first`
+    digits = (np.arange(5 ** (last - first))[:, None] // 5 ** np.arange(last - first)) % 5
+    placed = np.cumsum(digits, axis=1) - digits
+    tables = np.zeros((MAX_CARDS + 1, len(digits)), dtype=np.int32)
+    for k in range(MAX_CARDS + 1):
+        left = np.clip(k - placed, 0, MAX_CARDS) # Overfull rows are never looked up
+        tables[k] = OFFSET[np.arange(first, last), left, digits].sum(axis=1)
+    return tables, digits.sum(axis=1)
+
+LOW_HASH, LOW_CARDS = _half_hashes(0, SPLIT)
+HIGH_HASH, _ = _half_hashes(SPLIT, RANKS)
+
+# Suit counts packed 3 bits each, also a plain sum; FLUSH_SUIT maps the
+# packed counts to the suit holding five or more cards, or -1
+SUIT_KEY = 1 << (3 * (np.arange(52) % 4))
+_packed = np.arange(1 << 12)
+_suit_counts = (_packed[:, None] >> (3 * np.arange(4))) & 7
+FLUSH_SUIT = np.where(_suit_counts.max(axis=1) >= 5, _suit_counts.argmax(axis=1), -1)
+RANK_KEY = POW5[np.arange(52) // 4]
+RANK_BIT = 1 << (np.arange(52) // 4)
+
+# --- 2. LOOKUP ---
+def load_tables():
+    if not os.path.exists(EVAL_PATH): return None, None
+    data = np.fromfile(EVAL_PATH, dtype="<u2")
+    return data[:NOFLUSH_SIZE], data[NOFLUSH_SIZE:]
+
+NOFLUSH, FLUSH = load_tables()
+
+def evaluate(cards):
+    # cards: (N, n) card indices, 5 <= n <= 7 -> (N,) treys scores
+    cards = np.asarray(cards, dtype=np.int64)
+    n = cards.shape[1]
+    low, high = np.divmod(RANK_KEY[cards].sum(axis=1), 5 ** SPLIT)[::-1]
+    values = NOFLUSH[TABLE_BASE[n] + LOW_HASH[n, low] + HIGH_HASH[n - LOW_CARDS[low], high]]
+
+    # At most one suit can hold five of seven cards
+    flush_suit = FLUSH_SUIT[SUIT_KEY[cards].sum(axis=1)]
+    rows = np.flatnonzero(flush_suit >= 0)
+    if len(rows):
+        flushed = cards[rows]
+        masks = np.where((flushed & 3) == flush_suit[rows, None], RANK_BIT[flushed], 0).sum(axis=1)
+        values[rows] = np.minimum(values[rows], FLUSH[masks])
+    return values
+
+# Worst score of each treys rank class, royal flush (0) to high card (9)
+CLASS_LIMITS = np.array(sorted(LookupTable.MAX_TO_RANK_CLASS))
+
+def rank_classes(values):
+    return np.searchsorted(CLASS_LIMITS, values)
+
+def class_names(values):
+    return [LookupTable.RANK_CLASS_TO_STRING[int(c)] for c in rank_classes(values)]
+
+# --- 3. GENERATOR ---
+def multisets(n, rank=0):
+    # Every rank-count vector with n cards in total, at most 4 per rank
+    if rank == RANKS - 1:
+        if n <= 4: yield [n]
+        return
+    for c in range(min(4, n) + 1):
+        for rest in multisets(n - c, rank + 1): yield [c] + rest
+
+def generate():
+    treys = Evaluator()
+    noflush = np.zeros(NOFLUSH_SIZE, dtype="<u2")
+    for n in range(MIN_CARDS, MAX_CARDS + 1):
+        vectors = list(multisets(n))
+        hashes = multiset_hash(np.array(vectors))
+        assert sorted(hashes) == list(range(TABLE_SIZES[n])) # Perfect and dense
+        for counts, h in zip(vectors, hashes):
+            # Deal the suits round-robin so no suit gets five cards
+            cards, dealt = [], 0
+            for rank, c in enumerate(counts):
+                for _ in range(c):
+                    cards.append(Card.new(Card.STR_RANKS[rank] + "shdc"[dealt % 4]))
+                    dealt += 1
+            noflush[TABLE_BASE[n] + h] = treys.evaluate(cards[:2], cards[2:])
+
+    flush = np.full(FLUSH_SIZE, WORST, dtype="<u2")
+    for mask in range(FLUSH_SIZE):
+        if MIN_CARDS <= bin(mask).count("1") <= MAX_CARDS:
+            cards = [Card.new(Card.STR_RANKS[r] + "s") for r in range(RANKS) if mask >> r & 1]
+            flush[mask] = treys.evaluate(cards[:2], cards[2:])
+    return noflush, flush
+
+if __name__ == "__main__":
+    os.makedirs(os.path.dirname(EVAL_PATH), exist_ok=True)
+    noflush, flush = generate()
+    np.concatenate([noflush, flush]).tofile(EVAL_PATH)
+    print(f"Saved {EVAL_PATH}: {NOFLUSH_SIZE} rank multisets, {FLUSH_SIZE} flush masks")
@@ -0,0 +1,104 @@
+# backend/app/poker_preflop.py
+# Preflop equities for the 169 starting-hand classes (13 pairs, 78 suited,
+# 78 offsuit) against 1 to 8 random hands, built offline by Monte Carlo
+# and loaded once, so a preflop decision is one array lookup. Classes sit
+# on a 13x13 grid: pairs on the diagonal, suited hands at (high, low) and
+# offsuit hands at (low, high). Stored as uint16 fractions of 65535.
+#
+# Rebuild with: python -m app.poker_preflop [--samples N]
+# Spot-check:   python -m app.poker_preflop --check
+import argparse
+import os
+import numpy as np
+from treys import Card
+from .poker_equity import estimate_equity
+
+PREFLOP_PATH = os.path.join(os.path.dirname(__file__), "data", "preflop_equity.bin")
+CLASSES = 169
+MAX_OPPONENTS = 8
+RANKS = Card.STR_RANKS # "23456789TJQKA"
+
+def hand_class(card1, card2):
+    # Index of the class of two treys cards
+    r1, r2 = Card.get_rank_int(card1), Card.get_rank_int(card2)
+    high, low = max(r1, r2), min(r1, r2)
+    if Card.get_suit_int(card1) == Card.get_suit_int(card2): return high * 13 + low
+    return low * 13 + high
+
+def class_name(index):
+    a, b = divmod(index, 13)
+    if a == b: return RANKS[a] * 2
+    return RANKS[max(a, b)] + RANKS[min(a, b)] + ("s" if a > b else "o")
+
+def class_cards(index):
+    # A representative hand of the class, as treys cards
+    a, b = divmod(index, 13)
+    suit2 = "s" if a > b else "h"
+    return [Card.new(RANKS[a] + "s"), Card.new(RANKS[b] + suit2)]
+
+# --- 1. LOOKUP ---
+def load_table():
+    if not os.path.exists(PREFLOP_PATH): return None
+    return np.fromfile(PREFLOP_PATH, dtype="<u2").reshape(MAX_OPPONENTS, CLASSES)
+
+_table = load_table()
+
+def preflop_equity(hand, opponents=1):
+    # Equity of two treys cards against `opponents` random hands (clamped
+    # to 1-8). Falls back to sampling if the table hasn't been built.
+    opponents = min(max(opponents, 1), MAX_OPPONENTS)
+    if _table is None: return estimate_equity(hand, (), opponents)[0]
+    return _table[opponents - 1, hand_class(*hand)] / 65535
+
+def preflop_equities(cards, opponents=1):
+    # preflop_equity for an (N, 2) array of card indices (rank * 4 + suit)
+    ranks, suits = cards // 4, cards % 4
+    high, low = ranks.max(axis=1), ranks.min(axis=1)
+    classes = np.where(suits[:, 0] == suits[:, 1], high * 13 + low, low * 13 + high)
+    opponents = min(max(opponents, 1), MAX_OPPONENTS)
+    if _table is None: return np.array([preflop_equity(class_cards(i), opponents) for i in classes])
+    return _table[opponents - 1, classes] / 65535
+
+def preflop_chart(opponents=1):
+    # Every class with its equity, for the UI's starting-hand chart
+    return {class_name(i): round(preflop_equity(class_cards(i), opponents), 4) for i in range(CLASSES)}
+
+# --- 2. GENERATOR ---
+def generate(samples, seed=169):
+    table = np.zeros((MAX_OPPONENTS, CLASSES), dtype="<u2")
+    for opponents in range(1, MAX_OPPONENTS + 1):
+        for index in range(CLASSES):
+            rng = np.random.default_rng(seed * 1000 + opponents * CLASSES + index)
+            equity, _ = estimate_equity(class_cards(index), (), opponents, max_ms=float("inf"),
+                                        rng=rng, ci_half_width=0, max_samples=samples)
+            table[opponents - 1, index] = round(equity * 65535)
+        print(f"{opponents} opponent(s): {class_name(168)} {table[opponents - 1, 168] / 65535:.3f}, "
+              f"{class_name(5)} {table[opponents - 1, 5] / 65535:.3f}")
+    return table
+
+def check(samples, count=12, tolerance=0.02):
+    # Re-samples a few classes with a different seed; returns the mismatches
+    rng = np.random.default_rng()
+    bad = []
+    for _ in range(count):
+        index, opponents = int(rng.integers(CLASSES)), int(rng.integers(1, MAX_OPPONENTS + 1))
+        fresh, _ = estimate_equity(class_cards(index), (), opponents, max_ms=float("inf"),
+                                   rng=rng, ci_half_width=0, max_samples=samples)
+        stored = preflop_equity(class_cards(index), opponents)
+        status = "ok" if abs(fresh - stored) <= tolerance else "BAD"
+        if status == "BAD": bad.append((class_name(index), opponents))
+        print(f"{status} {class_name(index):>4} vs {opponents}: table {stored:.4f} sampled {fresh:.4f}")
+    return bad
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or check the preflop equity table")
+    parser.add_argument("--samples", type=int, default=20000, help="Samples per class and opponent count")
+    parser.add_argument("--check", action="store_true", help="Compare the stored table against fresh samples")
+    args = parser.parse_args()
+
+    if args.check:
+        if _table is None: raise SystemExit(f"No table at {PREFLOP_PATH}")
+        raise SystemExit(1 if check(args.samples) else 0)
+    os.makedirs(os.path.dirname(PREFLOP_PATH), exist_ok=True)
+    generate(args.samples).tofile(PREFLOP_PATH)
+    print(f"Saved {PREFLOP_PATH}")
@@ -0,0 +1,236 @@
+# backend/app/poker_range.py
+# Equity of hand ranges against each other on a partial board. Small
+# spots are enumerated exactly (every non-clashing combo assignment times
+# every runout); larger ones are sampled like poker_equity. Results are
+# cached under a suit-isomorphic key: relabelling the suits of the board
+# and every range the same way can't change the equities, so equivalent
+# spots (e.g. AhKh vs QQ on 2h7h9c and AsKs vs QQ on 2s7s9d) share one
+# entry.
+#
+# Range syntax, comma separated: QQ, TT+, 22-55, AKs, AKo, AK (both),
+# A2s+, KTo-KQo, AhKd (one combo), 15% (top 15% of starting hands by
+# heads-up equity), random.
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import combinations, permutations
+import numpy as np
+from .poker_equity import BATCH, CI_HALF_WIDTH, DEFAULT_EQUITY_MS, MAX_SAMPLES, MIN_SAMPLES
+from .poker_eval import CARD_INDEX, evaluate
+from .poker_preflop import CLASSES, class_cards, preflop_equity
+
+RANKS = "23456789TJQKA"
+MAX_PLAYERS = 9
+EXACT_LIMIT = 500000 # Deals "auto" will enumerate before it samples instead
+EXACT_MAX = 2000000 # Most deals mode="exact" will enumerate (a few seconds)
+EXACT_CHUNK = 50000
+RANGE_CACHE_SIZE = 1024
+
+ALL_COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+CARD_BIT = 1 << np.arange(52, dtype=np.int64)
+
+# --- 1. RANGE PARSING ---
+def _rank(ch):
+    index = RANKS.find(ch.upper())
+    if index < 0: raise ValueError(f"Unknown rank: {ch}")
+    return index
+
+def _class_combos(high, low, kind):
+    # kind: "s" suited, "o" offsuit, "" both (pairs ignore it)
+    cards = []
+    for s1 in range(4):
+        for s2 in range(4):
+            if high == low and s2 <= s1: continue
+            if high != low and kind == "s" and s1 != s2: continue
+            if high != low and kind == "o" and s1 == s2: continue
+            cards.append((high * 4 + s1, low * 4 + s2))
+    return cards
+
+def _top_combos(percent):
+    # Strongest classes by heads-up equity until `percent` of all combos
+    order = sorted(range(CLASSES), key=lambda i: -preflop_equity(class_cards(i)))
+    combos = []
+    for index in order:
+        if len(combos) >= percent / 100 * len(ALL_COMBOS): break
+        a, b = divmod(index, 13)
+        kind = "" if a == b else "s" if a > b else "o"
+        combos += _class_combos(max(a, b), min(a, b), kind)
+    return combos
+
+TOKEN = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)(\+?)$", re.I)
+DASHED = re.compile(r"^([2-9TJQKA])([2-9TJQKA])([so]?)-([2-9TJQKA])([2-9TJQKA])([so]?)$", re.I)
+
+def _parse_token(token):
+    if token.lower() == "random": return [tuple(c) for c in ALL_COMBOS.tolist()]
+    if token.endswith("%"): return _top_combos(float(token[:-1]))
+    if len(token) == 4 and token[:2] in CARD_INDEX and token[2:] in CARD_INDEX:
+        return [(CARD_INDEX[token[:2]], CARD_INDEX[token[2:]])]
+
+    match = TOKEN.match(token)
+    if match:
+        high, low, kind, plus = _rank(match[1]), _rank(match[2]), match[3].lower(), match[4]
+        high, low = max(high, low), min(high, low)
+        if not plus: return _class_combos(high, low, kind)
+        if high == low: # TT+ = TT..AA
+            return [c for r in range(high, 13) for c in _class_combos(r, r, "")]
+        return [c for r in range(low, high) for c in _class_combos(high, r, kind)] # A2s+ = A2s..AKs
+
+    match = DASHED.match(token)
+    if match and match[3].lower() == match[6].lower():
+        kind = match[3].lower()
+        a1, b1, a2, b2 = (_rank(match[i]) for i in (1, 2, 4, 5))
+        if a1 == b1 and a2 == b2: # 22-55
+            return [c for r in range(min(a1, a2), max(a1, a2) + 1) for c in _class_combos(r, r, "")]
+        if a1 == a2: # KTo-KQo: same top card, a span of kickers
+            return [c for r in range(min(b1, b2), max(b1, b2) + 1) for c in _class_combos(a1, r, kind)]
+    raise ValueError(f"Can't read range token: {token}")
+
+def parse_range(text):
+    # Range string -> (K, 2) array of card index pairs, low card first
+    combos = set()
+    for token in text.replace(" ", "").split(","):
+        if token: combos.update(tuple(sorted(pair)) for pair in _parse_token(token))
+    if not combos: raise ValueError(f"Empty range: {text!r}")
+    return np.array(sorted(combos), dtype=np.int64)
+
+# --- 2. CANONICAL KEYS ---
+# Card index under each of the 24 suit relabellings
+SUIT_MAPS = np.array([[(c // 4) * 4 + perm[c % 4] for c in range(52)] for perm in permutations(range(4))])
+
+def canonical_key(board, ranges):
+    # Smallest encoding over all suit relabellings. Board order and combo
+    # order within a range don't matter; range order does.
+    best = None
+    for mapping in SUIT_MAPS:
+        parts = [np.sort(mapping[board]).tobytes()]
+        for combos in ranges:
+            pairs = np.sort(mapping[combos], axis=1)
+            parts.append(np.sort(pairs[:, 0] * 52 + pairs[:, 1]).tobytes())
+        key = b"|".join(parts)
+        if best is None or key < best: best = key
+    return best
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# --- 3. EQUITY ---
+def _shares(scores):
+    # scores: (N, players) -> each player's share of the pot per deal
+    best = scores.min(axis=1, keepdims=True)
+    winners = scores == best
+    return winners / winners.sum(axis=1, keepdims=True)
+
+def _score(holes, board_cards):
+    # holes: (N, players, 2), board_cards: (N, 5) -> (N, players)
+    return np.stack([evaluate(np.hstack([holes[:, p], board_cards])) for p in range(holes.shape[1])], axis=1)
+
+def _assignments(ranges):
+    # Every non-clashing choice of one combo per player, as (M, players, 2)
+    # holes with their card masks
+    holes = ranges[0][:, None, :]
+    masks = CARD_BIT[ranges[0]].sum(axis=1)
+    for combos in ranges[1:]:
+        combo_masks = CARD_BIT[combos].sum(axis=1)
+        ok = (masks[:, None] & combo_masks[None, :]) == 0
+        rows, cols = np.nonzero(ok)
+        holes = np.concatenate([holes[rows], combos[cols][:, None, :]], axis=1)
+        masks = masks[rows] | combo_masks[cols]
+    return holes, masks
+
+def _exact(board, ranges, holes, masks):
+    # Sums each player's pot share over every assignment and runout
+    missing = 5 - len(board)
+    deck = np.setdiff1d(np.arange(52), board)
+    runouts = list(combinations(deck, missing)) # A single empty runout on the river
+    runouts = np.array(runouts, dtype=np.int64).reshape(len(runouts), missing)
+    runout_masks = CARD_BIT[runouts].sum(axis=1)
+    totals, deals = np.zeros(len(ranges)), 0
+    step = max(1, EXACT_CHUNK // len(runouts))
+    for start in range(0, len(holes), step):
+        rows, cols = np.nonzero((masks[start:start + step, None] & runout_masks[None, :]) == 0)
+        board_cards = np.hstack([np.broadcast_to(board, (len(rows), len(board))), runouts[cols]])
+        totals += _shares(_score(holes[start + rows], board_cards)).sum(axis=0)
+        deals += len(rows)
+    return totals, deals
+
+def _sampled(board, ranges, max_ms, rng):
+    # Random deals until player 0's 95% interval is tight or time runs out
+    deadline = time.perf_counter() + max_ms / 1000
+    missing = 5 - len(board)
+    board_mask = int(CARD_BIT[board].sum())
+    totals, total_sq, deals = np.zeros(len(ranges)), 0.0, 0
+    while deals < MAX_SAMPLES:
+        batch_start = time.perf_counter()
+        # One random combo per player; drop deals where two players clash
+        picks = [combos[rng.integers(len(combos), size=BATCH)] for combos in ranges]
+        holes = np.stack(picks, axis=1)
+        used, ok = np.full(BATCH, board_mask), np.ones(BATCH, dtype=bool)
+        for pick in picks:
+            pick_mask = CARD_BIT[pick].sum(axis=1)
+            ok &= (used & pick_mask) == 0
+            used |= pick_mask
+        holes, used = holes[ok], used[ok]
+        if len(holes):
+            # Runout from the cards nobody holds: dealt cards sort last
+            keys = rng.random((len(holes), 52)) + ((used[:, None] >> np.arange(52)) & 1)
+            board_cards = np.hstack([np.broadcast_to(board, (len(holes), len(board))), keys.argsort(axis=1)[:, :missing]])
+            shares = _shares(_score(holes, board_cards))
+            totals += shares.sum(axis=0)
+            total_sq += (shares[:, 0] ** 2).sum()
+            deals += len(holes)
+        if deals >= MIN_SAMPLES:
+            mean = totals[0] / deals
+            stderr = np.sqrt(max(total_sq / deals - mean * mean, 0.0) / deals)
+            if 1.96 * stderr < CI_HALF_WIDTH: break
+        now = time.perf_counter()
+        if now + (now - batch_start) > deadline: break
+    return totals, deals
+
+def range_equity(range_texts, board_strs=(), mode="auto", max_ms=DEFAULT_EQUITY_MS, rng=None):
+    # Equity of each range against all the others. mode: "exact",
+    # "sample" or "auto" (exact when it's at most EXACT_LIMIT deals).
+    # Raises ValueError on bad input or when no deal fits the ranges.
+    if not 2 <= len(range_texts) <= MAX_PLAYERS: raise ValueError(f"Send 2 to {MAX_PLAYERS} ranges")
+    if mode not in ("auto", "exact", "sample"): raise ValueError(f"Unknown mode: {mode}")
+    try:
+        board = np.array([CARD_INDEX[c] for c in board_strs], dtype=np.int64)
+    except KeyError as e:
+        raise ValueError(f"Invalid card: {e.args[0]}")
+    if len(board) > 5 or len(set(board.tolist())) != len(board): raise ValueError("The board must be 0 to 5 different cards")
+
+    # Combos that use a board card can't be dealt
+    board_mask = int(CARD_BIT[board].sum())
+    ranges = [combos[(CARD_BIT[combos].sum(axis=1) & board_mask) == 0] for combos in map(parse_range, range_texts)]
+    if any(len(combos) == 0 for combos in ranges): raise ValueError("A range has no combos left on this board")
+
+    # Upper bound on the deals to enumerate, before building any of them
+    work = math.prod(len(combos) for combos in ranges) * math.comb(52 - len(board), 5 - len(board))
+    exact = mode == "exact" or (mode == "auto" and work <= EXACT_LIMIT)
+    if exact and work > EXACT_MAX: raise ValueError("Too many deals to enumerate; use mode=sample")
+
+    # Exact results answer any request; a sampled one only requests whose
+    # budget is no bigger than the one it was sampled with
+    budget = math.inf if exact else max_ms
+    key = (canonical_key(board, ranges), exact)
+    with _cache_lock:
+        if key in _cache and _cache[key][0] >= budget:
+            _cache.move_to_end(key)
+            return dict(_cache[key][1], cached=True)
+
+    if exact: totals, deals = _exact(board, ranges, *_assignments(ranges))
+    else: totals, deals = _sampled(board, ranges, max_ms, rng or np.random.default_rng())
+    if deals == 0: raise ValueError("No deal fits these ranges")
+
+    result = {
+        "equities": [round(float(t / deals), 4) for t in totals],
+        "combos": [len(combos) for combos in ranges],
+        "exact": bool(exact),
+        "deals": int(deals),
+    }
+    with _cache_lock:
+        if key not in _cache or _cache[key][0] < budget: _cache[key] = (budget, result)
+        _cache.move_to_end(key)
+        while len(_cache) > RANGE_CACHE_SIZE: _cache.popitem(last=False)
+    return dict(result, cached=False)
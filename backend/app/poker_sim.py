@@ -0,0 +1,281 @@
+# backend/app/poker_sim.py
+# Headless no-limit hold'em: thousands of tables play the same hand in
+# lockstep, with all state in (tables, seats) arrays, so bot policies can
+# be compared at volume without the web UI. Every hand starts from fresh
+# random stacks (40-150 big blinds), which makes short all-ins and side
+# pots common. Results are net chips per seat, reported per policy.
+#
+# Policies map the acting players' view to actions (FOLD, CALL, RAISE,
+# ALL_IN), one array call per betting step across all tables. "bot"
+# plays bot_decision's thresholds (poker_ai), with a small sampled equity
+# against the betting range when facing a bet, as bot_decision does.
+#
+# Usage:
+#   python -m app.poker_sim --tables 1000 --hands 20 --seats 6
+#   python -m app.poker_sim --policies bot station --seats 2 --out results.json
+import argparse
+import json
+import time
+import numpy as np
+from .poker_ai import (BETTING_RANGE, BLUFF_CALL, CALL_EQUITY, PREFLOP_BLUFF, PREFLOP_CALL, PREFLOP_RAISE,
+                       RAISE_EQUITY)
+from .poker_eval import evaluate
+from .poker_preflop import preflop_equities
+from .poker_range import CARD_BIT, parse_range
+
+SMALL_BLIND, BIG_BLIND = 1, 2
+MIN_BUYIN, MAX_BUYIN = 40 * BIG_BLIND, 150 * BIG_BLIND
+MIN_SEATS, MAX_SEATS = 2, 9
+MAX_RAISES = 4 # Per street; later raises become calls
+FOLD, CALL, RAISE, ALL_IN = 0, 1, 2, 3 # CALL with nothing to call is a check
+VISIBLE = (0, 3, 4, 5) # Board cards seen on each street
+BOT_SAMPLES = 48 # Equity samples per decision for the "bot" policy
+COMBO_TRIES = 8 # Redraws of a range combo that clashes with known cards
+NO_HAND = 9999 # Score of a folded player, worse than any hand
+
+# --- 1. POLICIES ---
+# Each gets a dict of arrays over the n acting players (hole (n, 2),
+# board (n, visible), to_call, stack, pot, players still in) plus the
+# street index and an rng, and returns n action codes.
+def sample_combos(combos, known, samples, rng):
+    # `samples` combos per row that miss that row's known cards, as
+    # (n, samples, 2), and where a combo still clashed after every redraw
+    known_mask = CARD_BIT[known].sum(axis=1)
+    combo_mask = CARD_BIT[combos].sum(axis=1)
+    picks = rng.integers(len(combos), size=(len(known), samples))
+    for _ in range(COMBO_TRIES):
+        clash = (combo_mask[picks] & known_mask[:, None]) != 0
+        if not clash.any(): break
+        picks[clash] = rng.integers(len(combos), size=int(clash.sum()))
+    return combos[picks], (combo_mask[picks] & known_mask[:, None]) != 0
+
+def sampled_equity(hole, board, rng, samples=BOT_SAMPLES, villains=None):
+    # Heads-up equity of each hole pair over `samples` opponent hands and
+    # runouts per player. Opponents hold random hands, or combos drawn
+    # from `villains` ((K, 2) cards, e.g. parse_range(BETTING_RANGE)).
+    n, visible = len(hole), board.shape[1]
+    known = np.hstack([hole, board])
+    keys = rng.random((n, samples, 52), dtype=np.float32)
+    keys[np.arange(n)[:, None], :, known] += 1 # Known cards sort last
+    if villains is None:
+        drawn = keys.argsort(axis=2)[:, :, :7 - visible]
+        opponent, runout, clash = drawn[:, :, :2], drawn[:, :, 2:], np.zeros((n, samples), dtype=bool)
+    else:
+        opponent, clash = sample_combos(villains, known, samples, rng)
+        keys[np.arange(n)[:, None, None], np.arange(samples)[None, :, None], opponent] += 1
+        runout = keys.argsort(axis=2)[:, :, :5 - visible]
+    full_board = np.concatenate([np.broadcast_to(board[:, None], (n, samples, visible)), runout], axis=2)
+    hero = evaluate(np.concatenate([np.broadcast_to(hole[:, None], (n, samples, 2)), full_board], axis=2).reshape(-1, 7))
+    villain = evaluate(np.concatenate([opponent, full_board], axis=2).reshape(-1, 7))
+    share = np.where(hero < villain, 1.0, np.where(hero == villain, 0.5, 0.0)).reshape(n, samples)
+    share[clash] = 0 # Deals that couldn't be drawn don't count
+    return share.sum(axis=1) / np.maximum(samples - clash.sum(axis=1), 1)
+
+_betting_combos = None
+
+def betting_combos():
+    # BETTING_RANGE as card pairs, parsed on first use
+    global _betting_combos
+    if _betting_combos is None: _betting_combos = parse_range(BETTING_RANGE)
+    return _betting_combos
+
+def bot_policy(view, street, rng):
+    # bot_decision: raise/call/bluff preflop (all-in when the bet covers
+    # the stack), equity bands after, weighed against BETTING_RANGE when
+    # facing a bet
+    to_call, stack = view["to_call"], view["stack"]
+    n = len(to_call)
+    if street == 0:
+        equity = preflop_equities(view["hole"])
+        bluff = rng.random(n) < PREFLOP_BLUFF
+        actions = np.where(equity > PREFLOP_RAISE, RAISE, np.where(equity > PREFLOP_CALL, CALL, np.where(bluff, RAISE, CALL)))
+    else:
+        facing = to_call > 0
+        equity = np.empty(n)
+        equity[~facing] = sampled_equity(view["hole"][~facing], view["board"][~facing], rng)
+        equity[facing] = sampled_equity(view["hole"][facing], view["board"][facing], rng, villains=betting_combos())
+        weak = np.where(facing & (rng.random(n) > BLUFF_CALL), FOLD, CALL)
+        actions = np.where(equity > RAISE_EQUITY, RAISE, np.where(equity > CALL_EQUITY, CALL, weak))
+    return np.where((actions != FOLD) & (to_call >= stack), ALL_IN, actions)
+
+def tight_policy(view, street, rng):
+    # Folds most hands preflop, bets only strong ones after
+    to_call = view["to_call"]
+    if street == 0:
+        equity = preflop_equities(view["hole"])
+        return np.where(equity > 0.6, RAISE, np.where((equity > 0.55) | (to_call == 0), CALL, FOLD))
+    equity = sampled_equity(view["hole"], view["board"], rng)
+    return np.where(equity > 0.75, RAISE, np.where((equity > 0.5) | (to_call == 0), CALL, FOLD))
+
+def station_policy(view, street, rng):
+    # Calls everything
+    return np.full(len(view["to_call"]), CALL)
+
+def random_policy(view, street, rng):
+    return rng.choice([FOLD, CALL, RAISE, ALL_IN], size=len(view["to_call"]), p=[0.2, 0.5, 0.25, 0.05])
+
+POLICIES = {"bot": bot_policy, "tight": tight_policy, "station": station_policy, "random": random_policy}
+
+# --- 2. TABLES ---
+class Tables:
+    def __init__(self, count, seats, policies, seed=None):
+        # policies: names, assigned to seats in turn (seat i gets
+        # policies[i % len(policies)]); the button moves every hand
+        if not MIN_SEATS <= seats <= MAX_SEATS: raise ValueError(f"Seats must be {MIN_SEATS} to {MAX_SEATS}")
+        self.count, self.seats = count, seats
+        self.seat_policy = np.array([policies[i % len(policies)] for i in range(seats)])
+        self.rng = np.random.default_rng(seed)
+        self.button = np.arange(count) % seats # Staggered across tables
+        self.net = np.zeros((count, seats), dtype=np.int64) # Chips won, summed over hands
+        self.pots_won = np.zeros((count, seats), dtype=np.int64)
+        self.hands = 0
+
+    def commit(self, t, seat, amount):
+        self.stacks[t, seat] -= amount
+        self.bets[t, seat] += amount
+        self.contrib[t, seat] += amount
+
+    def play_hand(self):
+        T, S, rng = self.count, self.seats, self.rng
+        rows = np.arange(T)
+        start = rng.integers(MIN_BUYIN, MAX_BUYIN + 1, size=(T, S))
+        self.stacks = start.copy()
+        self.bets = np.zeros((T, S), dtype=np.int64)
+        self.contrib = np.zeros((T, S), dtype=np.int64)
+        self.folded = np.zeros((T, S), dtype=bool)
+        deck = rng.random((T, 52)).argsort(axis=1)
+        holes = deck[:, :2 * S].reshape(T, S, 2)
+        board = deck[:, 2 * S:2 * S + 5]
+
+        # Heads-up the button posts the small blind
+        sb = self.button if S == 2 else (self.button + 1) % S
+        bb = (sb + 1) % S
+        self.commit(rows, sb, np.minimum(SMALL_BLIND, self.stacks[rows, sb]))
+        self.commit(rows, bb, np.minimum(BIG_BLIND, self.stacks[rows, bb]))
+
+        for street, visible in enumerate(VISIBLE):
+            first = (bb + 1) % S if street == 0 else (self.button + 1) % S
+            self.betting_round(street, first, holes, board[:, :visible])
+            self.bets[:] = 0
+
+        self.showdown(holes, board)
+        self.net += self.stacks - start
+        self.button = (self.button + 1) % S
+        self.hands += 1
+
+    def betting_round(self, street, first, holes, board):
+        T, S = self.count, self.seats
+        pointer = first.copy()
+        raises = np.zeros(T, dtype=np.int64)
+        can_act = ~self.folded & (self.stacks > 0)
+        # A lone player who can still act only does so facing a bet
+        to_call = self.bets.max(axis=1, keepdims=True) - self.bets
+        need = can_act & ((can_act.sum(axis=1, keepdims=True) > 1) | (to_call > 0))
+
+        while True:
+            need &= ((~self.folded).sum(axis=1) > 1)[:, None]
+            t = np.flatnonzero(need.any(axis=1))
+            if not len(t): return
+            # Next seat from the pointer that still has to act
+            order = (pointer[t, None] + np.arange(S)) % S
+            seat = order[np.arange(len(t)), need[t[:, None], order].argmax(axis=1)]
+
+            top = self.bets[t].max(axis=1)
+            view = {
+                "hole": holes[t, seat], "board": board[t],
+                "to_call": top - self.bets[t, seat], "stack": self.stacks[t, seat],
+                "pot": self.contrib[t].sum(axis=1), "players": (~self.folded[t]).sum(axis=1),
+            }
+            actions = np.empty(len(t), dtype=np.int64)
+            for name in set(self.seat_policy):
+                mine = self.seat_policy[seat] == name
+                if mine.any():
+                    actions[mine] = POLICIES[name]({k: v[mine] for k, v in view.items()}, street, self.rng)
+            self.apply(t, seat, actions, view, raises)
+            need[t, seat] = False
+            # A raise reopens the action for everyone else still able to act
+            raised = self.bets[t, seat] > top
+            raises[t] += raised
+            reopen = t[raised]
+            need[reopen] = ~self.folded[reopen] & (self.stacks[reopen] > 0)
+            need[reopen, seat[raised]] = False
+            pointer[t] = (seat + 1) % S
+
+    def apply(self, t, seat, actions, view, raises):
+        to_call, stack, pot = view["to_call"], view["stack"], view["pot"]
+        actions = np.where((actions == RAISE) & (raises[t] >= MAX_RAISES), CALL, actions)
+        actions = np.where((actions == FOLD) & (to_call == 0), CALL, actions) # Never fold for free
+        raise_size = to_call + np.maximum(BIG_BLIND, (pot + to_call) // 2) # Half-pot raise
+        amount = np.select([actions == CALL, actions == RAISE, actions == ALL_IN],
+                           [np.minimum(to_call, stack), np.minimum(raise_size, stack), stack], 0)
+        self.folded[t, seat] |= actions == FOLD
+        self.commit(t, seat, amount)
+
+    def showdown(self, holes, board):
+        # Splits the pot layer by layer: each distinct contribution level
+        # is a side pot for the players still in who put in at least that
+        T, S = self.count, self.seats
+        rows = np.arange(T)
+        cards = np.concatenate([holes, np.broadcast_to(board[:, None], (T, S, 5))], axis=2)
+        scores = np.where(self.folded, NO_HAND, evaluate(cards.reshape(-1, 7)).reshape(T, S))
+        levels = np.sort(self.contrib, axis=1)
+        prev = np.zeros(T, dtype=np.int64)
+        winnings = np.zeros((T, S), dtype=np.int64)
+        for k in range(S):
+            level = levels[:, k]
+            layer = (np.minimum(self.contrib, level[:, None]) - np.minimum(self.contrib, prev[:, None])).sum(axis=1)
+            eligible = ~self.folded & (self.contrib >= level[:, None])
+            eligible = np.where(eligible.any(axis=1, keepdims=True), eligible, ~self.folded)
+            ranked = np.where(eligible, scores, NO_HAND + 1)
+            winners = ranked == ranked.min(axis=1, keepdims=True)
+            count = winners.sum(axis=1)
+            winnings += winners * (layer // count)[:, None]
+            winnings[rows, winners.argmax(axis=1)] += layer % count # Odd chips
+            prev = level
+        self.stacks += winnings
+        self.pots_won += winnings > self.contrib
+
+    def report(self):
+        # Per policy: seat-hands played, big blinds won per 100 hands, and
+        # the share of hands that ended in profit
+        results = {}
+        for name in sorted(set(self.seat_policy.tolist())):
+            seats = np.flatnonzero(self.seat_policy == name)
+            hands = self.hands * self.count * len(seats)
+            results[name] = {
+                "hands": hands,
+                "bb_per_100": round(float(self.net[:, seats].sum()) / BIG_BLIND / hands * 100, 2),
+                "win_rate": round(float(self.pots_won[:, seats].sum()) / hands, 4),
+            }
+        return results
+
+# --- 3. RUNNER ---
+def simulate(tables=1000, seats=6, hands=10, policies=("bot", "station"), seed=None):
+    start = time.perf_counter()
+    sim = Tables(tables, seats, list(policies), seed)
+    for _ in range(hands): sim.play_hand()
+    elapsed = time.perf_counter() - start
+    return {
+        "config": {"tables": tables, "seats": seats, "hands": hands, "policies": list(policies), "seed": seed},
+        "hands_per_sec": round(tables * hands / elapsed, 1) if elapsed > 0 else 0,
+        "time_s": round(elapsed, 2),
+        "policies": sim.report(),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless multi-table poker simulation")
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--seats", type=int, default=6, choices=range(MIN_SEATS, MAX_SEATS + 1))
+    parser.add_argument("--hands", type=int, default=10, help="Hands per table")
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=["bot", "station"],
+                        help="Assigned to seats in turn")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--out", help="Write the results as JSON here")
+    args = parser.parse_args()
+
+    result = simulate(args.tables, args.seats, args.hands, args.policies, args.seed)
+    print(f"{args.tables * args.hands} hands in {result['time_s']} s ({result['hands_per_sec']} hands/s)")
+    for name, row in result["policies"].items():
+        print(f"{name:<8} {row['hands']:>8} seat-hands {row['bb_per_100']:>9} bb/100  won {row['win_rate']:.1%}")
+    if args.out:
+        with open(args.out, "w") as f: json.dump(result, f, indent=2)
@@ -1,24 +1,93 @@
 # backend/app/routers/chess.py
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from ..chess_ai import get_best_move
+from typing import Optional
+from ..chess_ai import get_best_move, MAX_DEPTH
+from ..chess_analysis import jobs, submit_job, cancel_job
+from ..chess_cache import RESULT_CACHE
 
 router = APIRouter(prefix="/games/chess", tags=["games"])
 
+DEFAULT_MOVE_MS = 1500 # Time budget when the client doesn't send one
+MAX_MOVE_MS = 10000
+
 class ChessMoveRequest(BaseModel):
     fen: str
     difficulty: int = 3
+    max_ms: Optional[int] = None # Per-move time budget (milliseconds)
+
+class AnalysisRequest(BaseModel):
+    fen: Optional[str] = None
+    pgn: Optional[str] = None # Whole game: every position is analysed
+    depth: int = 8
+    max_ms: int = 2000 # Per position
+    multipv: int = 1
 
 @router.post("/move")
-async def calculate_move(req: ChessMoveRequest):
+def calculate_move(req: ChessMoveRequest):
+    # Plain def: FastAPI runs the blocking search in its threadpool, not on
+    # the event loop that serves the analysis streams
     try:
-        # Determine depth based on difficulty
-        depth = min(max(req.difficulty, 1), 4) # Cap at 4 for performance
-        best_move_uci = get_best_move(req.fen, depth)
+        # Difficulty is the deepest iteration; the time budget (not a depth cap)
+        # is what bounds latency.
+        depth = min(max(req.difficulty, 1), MAX_DEPTH)
+        max_ms = min(max(req.max_ms or DEFAULT_MOVE_MS, 10), MAX_MOVE_MS)
+        best_move_uci = get_best_move(req.fen, depth, max_ms=max_ms)
         
         if not best_move_uci:
             return {"move": None, "game_over": True}
             
         return {"move": best_move_uci}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache")
+def cache_stats():
+    # Hit/miss counters for the best-move result cache (this worker)
+    return RESULT_CACHE.stats()
+
+
+# --- ANALYSIS JOBS ---
+@router.post("/analysis")
+def start_analysis(req: AnalysisRequest):
+    if not req.fen and not req.pgn:
+        raise HTTPException(status_code=400, detail="Send a fen or a pgn")
+    try:
+        job = submit_job(req.fen, req.pgn, req.depth, min(max(req.max_ms, 10), MAX_MOVE_MS), min(req.multipv, 5))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "positions": len(job.positions)}
+
+@router.get("/analysis/{job_id}")
+def get_analysis(job_id: str):
+    job = jobs.get(job_id)
+    if not job: raise HTTPException(status_code=404, detail="No such job")
+    return job.snapshot()
+
+@router.get("/analysis/{job_id}/stream")
+async def stream_analysis(job_id: str):
+    job = jobs.get(job_id)
+    if not job: raise HTTPException(status_code=404, detail="No such job")
+
+    # Server-Sent Events: one "data:" frame per search update
+    async def events():
+        cursor = 0
+        while True:
+            while cursor < len(job.events):
+                yield f"data: {json.dumps(job.events[cursor])}\n\n"
+                cursor += 1
+            if job.finished_at and cursor >= len(job.events): break
+            await asyncio.sleep(0.1)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.delete("/analysis/{job_id}")
+def stop_analysis(job_id: str):
+    job = cancel_job(job_id)
+    if not job: raise HTTPException(status_code=404, detail="No such job")
+    return {"job_id": job.id, "status": "cancelling" if not job.finished_at else job.status}
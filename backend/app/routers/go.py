@@ -1,18 +1,58 @@
 # backend/app/routers/go.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List
-from ..go_ai import GoBoard, get_bot_move
+from typing import List, Optional
+from ..go_ai import BOTS, GoBoard, SIZE, SIZES, area_score, choose_move
+from ..go_sessions import sessions, create_session
 
 router = APIRouter(prefix="/games/go", tags=["games"])
 
+DEFAULT_MOVE_MS = 1500 # Time budget when the client doesn't send one
+MAX_MOVE_MS = 10000
+MAX_PLAYOUTS = 50000
+OWNERSHIP_MS = 300 # Playout budget for a fresh ownership estimate
+
 class GoState(BaseModel):
     board: List[List[int]]
     row: int
     col: int
+    playouts: Optional[int] = None # Bot playout budget (default: go_ai.DEFAULT_PLAYOUTS)
+    max_ms: Optional[int] = None # Bot time budget (milliseconds)
+    bot: str = "mcts" # or "greedy": one-ply, answers in about a millisecond
+
+class GoBoardState(BaseModel):
+    board: List[List[int]]
+
+class NewGameRequest(BaseModel):
+    size: int = SIZE # 9, 13 or 19
+
+class GoMoveRequest(BaseModel):
+    row: int
+    col: int
+    playouts: Optional[int] = None
+    max_ms: Optional[int] = None
+    bot: str = "mcts"
+
+def bot_budget(playouts, max_ms):
+    # Whichever budget runs out first ends the bot's search
+    playouts = min(max(playouts, 1), MAX_PLAYOUTS) if playouts else None
+    return playouts, min(max(max_ms or DEFAULT_MOVE_MS, 10), MAX_MOVE_MS)
+
+def check_bot(bot):
+    if bot not in BOTS: raise HTTPException(status_code=400, detail=f"Bot must be one of {BOTS}")
+
+def check_board(board):
+    if len(board) not in SIZES or any(len(row) != len(board) for row in board):
+        raise HTTPException(status_code=400, detail=f"Board must be square, sized {SIZES}")
+    if any(v not in (0, 1, 2) for row in board for v in row):
+        raise HTTPException(status_code=400, detail="Board cells must be 0 (empty), 1 or 2")
 
 @router.post("/move")
 def player_move(state: GoState):
+    check_board(state.board)
+    check_bot(state.bot)
+    if not (0 <= state.row < len(state.board) and 0 <= state.col < len(state.board)):
+        raise HTTPException(status_code=400, detail="Move is off the board")
     game = GoBoard(state.board)
     valid, captured = game.make_move(state.row, state.col, 1) # Player is 1 (Black/Cyan)
     
@@ -20,7 +60,7 @@ def player_move(state: GoState):
         return {"valid": False}
         
     # If valid, Bot responds
-    bot_move = get_bot_move(game.board)
+    bot_move = choose_move(game.board, state.bot, *bot_budget(state.playouts, state.max_ms))
     bot_captured = []
     
     if bot_move:
@@ -32,4 +72,59 @@ def player_move(state: GoState):
         "captured_by_player": len(captured),
         "captured_by_bot": len(bot_captured),
         "bot_move": bot_move
-    }
\ No newline at end of file
+    }
+
+@router.post("/score")
+def score_board(state: GoBoardState):
+    # Tromp-Taylor area score of the position as it stands
+    check_board(state.board)
+    black, white, owner = area_score(GoBoard(state.board))
+    size = len(state.board)
+    return {
+        "black": black, "white": white, "winner": 1 if black > white else 2,
+        "owner": [owner[r * size:(r + 1) * size] for r in range(size)],
+    }
+
+
+# --- SERVER-SIDE GAMES ---
+# The server keeps the board and position history: moves are just
+# (row, col), ko is enforced, and replies list only the changed points.
+@router.post("/games")
+def new_game(req: NewGameRequest = NewGameRequest()):
+    if req.size not in SIZES: raise HTTPException(status_code=400, detail=f"Size must be one of {SIZES}")
+    try:
+        session = create_session(req.size)
+    except RuntimeError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return session.snapshot()
+
+@router.get("/games/{game_id}")
+def get_game(game_id: str):
+    session = sessions.get(game_id)
+    if not session: raise HTTPException(status_code=404, detail="No such game")
+    return session.snapshot()
+
+@router.post("/games/{game_id}/move")
+def session_move(game_id: str, req: GoMoveRequest):
+    session = sessions.get(game_id)
+    if not session: raise HTTPException(status_code=404, detail="No such game")
+    check_bot(req.bot)
+    return session.player_move(req.row, req.col, *bot_budget(req.playouts, req.max_ms), req.bot)
+
+@router.get("/games/{game_id}/score")
+def game_score(game_id: str):
+    session = sessions.get(game_id)
+    if not session: raise HTTPException(status_code=404, detail="No such game")
+    return session.score()
+
+@router.get("/games/{game_id}/ownership")
+def game_ownership(game_id: str):
+    # Cached per position, so the UI can poll this after every move
+    session = sessions.get(game_id)
+    if not session: raise HTTPException(status_code=404, detail="No such game")
+    return session.ownership(OWNERSHIP_MS)
+
+@router.delete("/games/{game_id}")
+def end_game(game_id: str):
+    if not sessions.pop(game_id, None): raise HTTPException(status_code=404, detail="No such game")
+    return {"id": game_id, "status": "deleted"}
@@ -3,6 +3,9 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 from ..poker_ai import deal_hand, evaluate_winner, bot_decision, Card
+from ..poker_eval import MAX_CARDS, MIN_CARDS, class_names, evaluate, parse_hand
+from ..poker_range import range_equity
+from ..poker_preflop import MAX_OPPONENTS, class_name, hand_class, preflop_chart, preflop_equity
 
 router = APIRouter(prefix="/games/poker", tags=["games"])
 
@@ -16,6 +19,29 @@ class PokerState(BaseModel):
     bot_chips: int
     current_bet: int
 
+class PreflopRequest(BaseModel):
+    hand: List[str] # e.g. ["Ah", "Kd"]
+    opponents: int = 1
+
+class EvaluateRequest(BaseModel):
+    hands: List[List[str]] # Hole cards per hand, e.g. [["Ah", "Kd"], ["7c", "7s"]]
+    board: List[str] = [] # Shared cards added to every hand
+
+class RangeEquityRequest(BaseModel):
+    ranges: List[str] # One per player, e.g. ["AhKh", "QQ+,AKs", "random"]
+    board: List[str] = []
+    mode: str = "auto" # auto, exact or sample
+    max_ms: int = 200 # Sampling budget
+
+MAX_EVALUATE_HANDS = 100000
+MAX_RANGE_MS = 2000
+
+def parse_cards(card_strs):
+    try:
+        return [Card.new(c) for c in card_strs]
+    except (KeyError, IndexError):
+        raise HTTPException(status_code=400, detail=f"Invalid cards: {card_strs}")
+
 @router.get("/deal")
 def deal():
     return deal_hand()
@@ -37,4 +63,49 @@ def move(state: PokerState):
 @router.post("/winner")
 def winner(state: PokerState):
     # Reveal all logic
-    return evaluate_winner(state.player_hand, state.bot_hand, state.board)
\ No newline at end of file
+    return evaluate_winner(state.player_hand, state.bot_hand, state.board)
+
+@router.post("/preflop")
+def preflop(req: PreflopRequest):
+    # Table lookup: equity of a starting hand against random hands
+    if len(req.hand) != 2 or req.hand[0] == req.hand[1]:
+        raise HTTPException(status_code=400, detail="Send two different cards")
+    hand = parse_cards(req.hand)
+    opponents = min(max(req.opponents, 1), MAX_OPPONENTS)
+    return {"class": class_name(hand_class(*hand)), "opponents": opponents, "equity": round(preflop_equity(hand, opponents), 4)}
+
+@router.get("/preflop/chart")
+def preflop_table(opponents: int = 1):
+    return preflop_chart(min(max(opponents, 1), MAX_OPPONENTS))
+
+@router.post("/evaluate")
+def evaluate_hands(req: EvaluateRequest):
+    # Scores many hands in one lookup-table call; lower scores are better
+    if not req.hands or len(req.hands) > MAX_EVALUATE_HANDS:
+        raise HTTPException(status_code=400, detail=f"Send 1 to {MAX_EVALUATE_HANDS} hands")
+    sizes = {len(hand) + len(req.board) for hand in req.hands}
+    if len(sizes) > 1 or not MIN_CARDS <= sizes.pop() <= MAX_CARDS:
+        raise HTTPException(status_code=400, detail=f"Every hand plus the board must be {MIN_CARDS} to {MAX_CARDS} cards")
+    try:
+        board = parse_hand(req.board)
+        hands = [parse_hand(hand) + board for hand in req.hands]
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid card: {e.args[0]}")
+    if any(len(set(hand)) != len(hand) for hand in hands):
+        raise HTTPException(status_code=400, detail="A hand repeats a card")
+
+    scores = evaluate(hands)
+    best = int(scores.min())
+    return {
+        "scores": scores.tolist(),
+        "ranks": class_names(scores),
+        "winners": [i for i, score in enumerate(scores.tolist()) if score == best],
+    }
+
+@router.post("/equity")
+def equity(req: RangeEquityRequest):
+    # Range-vs-range equity, enumerated when small enough, else sampled
+    try:
+        return range_equity(req.ranges, req.board, req.mode, min(max(req.max_ms, 1), MAX_RANGE_MS))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,9 +1,30 @@
 # backend/app/routers/sudoku.py
-from fastapi import APIRouter
-from ..sudoku_ai import get_new_sudoku
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List
+from ..sudoku_ai import SolveTimeout, get_new_sudoku, solve
 
 router = APIRouter(prefix="/games/sudoku", tags=["games"])
 
+MIN_GIVENS = 17 # No puzzle with fewer has a unique solution
+SOLVE_MS = 1000 # Search budget: real puzzles take well under 10 ms
+
+class SolveRequest(BaseModel):
+    puzzle: List[List[int]] # 9x9, 0 for blanks
+
 @router.get("/new")
 def new_game(difficulty: str = "medium"):
-    return get_new_sudoku(difficulty)
\ No newline at end of file
+    return get_new_sudoku(difficulty)
+
+@router.post("/solve")
+def solve_puzzle(req: SolveRequest):
+    if len(req.puzzle) != 9 or any(len(row) != 9 or any(not 0 <= v <= 9 for v in row) for row in req.puzzle):
+        raise HTTPException(status_code=400, detail="Send 9 rows of 9 digits (0 for blanks)")
+    if sum(1 for row in req.puzzle for v in row if v) < MIN_GIVENS:
+        raise HTTPException(status_code=400, detail=f"Send at least {MIN_GIVENS} givens")
+    try:
+        solution = solve(req.puzzle, SOLVE_MS)
+    except SolveTimeout:
+        raise HTTPException(status_code=422, detail="Puzzle takes too long to solve")
+    if solution is None: raise HTTPException(status_code=400, detail="Puzzle has no solution")
+    return {"solution": solution}
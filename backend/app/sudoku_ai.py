@@ -1,25 +1,135 @@
 # backend/app/sudoku_ai.py
 import random
+import time
+from itertools import islice
 
-# --- 1. SUDOKU GENERATOR ---
+# --- 1. BITMASK SOLVER ---
+# Cells are 0-80 in row-major order. Each row, column and box keeps a
+# 9-bit mask of the digits it already holds (bit d-1 for digit d), so a
+# cell's candidates are one OR and one NOT. Naked singles (one candidate
+# left) and hidden singles (a digit with one place left in a unit) are
+# filled in before every branch, and the search branches on the empty
+# cell with the fewest candidates.
+ALL_DIGITS = 0x1FF
+BOX_OF = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+CELL_UNITS = [(i // 9, i % 9, BOX_OF[i]) for i in range(81)] # (row, col, box)
+UNITS = ([[r * 9 + c for c in range(9)] for r in range(9)]
+         + [[r * 9 + c for r in range(9)] for c in range(9)]
+         + [[i for i in range(81) if BOX_OF[i] == b] for b in range(9)])
+POPCOUNT = [bin(m).count("1") for m in range(512)]
+DIGIT = {1 << d: d + 1 for d in range(9)}
+
+def _place(state, i, bit):
+    grid, rows, cols, boxes = state
+    r, c, b = CELL_UNITS[i]
+    grid[i] = DIGIT[bit]
+    rows[r] |= bit
+    cols[c] |= bit
+    boxes[b] |= bit
+
+def _candidates(state, i):
+    _, rows, cols, boxes = state
+    r, c, b = CELL_UNITS[i]
+    return ALL_DIGITS & ~(rows[r] | cols[c] | boxes[b])
+
+def _propagate(state):
+    # Fills in forced cells until none are left. Returns the most
+    # constrained empty cell (-1 when solved), or None on a contradiction.
+    grid, rows, cols, boxes = state
+    while True:
+        best, best_count, progress = -1, 10, False
+        for i in range(81):
+            if grid[i]: continue
+            r, c, b = CELL_UNITS[i]
+            cand = ALL_DIGITS & ~(rows[r] | cols[c] | boxes[b])
+            count = POPCOUNT[cand]
+            if count == 1:
+                grid[i] = DIGIT[cand]
+                rows[r] |= cand
+                cols[c] |= cand
+                boxes[b] |= cand
+                progress = True
+            elif count < best_count:
+                if count == 0: return None
+                best, best_count = i, count
+        if progress: continue
+
+        for unit in UNITS:
+            once = twice = placed = 0
+            for i in unit:
+                if grid[i]:
+                    placed |= 1 << (grid[i] - 1)
+                    continue
+                r, c, b = CELL_UNITS[i]
+                cand = ALL_DIGITS & ~(rows[r] | cols[c] | boxes[b])
+                twice |= once & cand
+                once |= cand
+            if (once | placed) != ALL_DIGITS: return None # A digit with nowhere to go
+            hidden = once & ~twice & ~placed
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                i = next((i for i in unit if not grid[i] and _candidates(state, i) & bit), None)
+                if i is None: return None # Two digits forced into one cell
+                _place(state, i, bit)
+                progress = True
+        if not progress: return best
+
+class SolveTimeout(Exception):
+    pass
+
+def _search(state, deadline=None):
+    # Yields every solution as a flat grid. Raises SolveTimeout once
+    # time.perf_counter() passes `deadline` (None: no limit).
+    if deadline is not None and time.perf_counter() > deadline: raise SolveTimeout()
+    cell = _propagate(state)
+    if cell is None: return
+    if cell == -1:
+        yield state[0]
+        return
+    cand = _candidates(state, cell)
+    while cand:
+        bit = cand & -cand
+        cand ^= bit
+        branch = tuple(part[:] for part in state)
+        _place(branch, cell, bit)
+        yield from _search(branch, deadline)
+
+def _initial_state(puzzle):
+    # 9x9 lists with 0 for blanks -> solver state, or None if a given clashes
+    state = ([0] * 81, [0] * 9, [0] * 9, [0] * 9)
+    for i, value in enumerate(v for row in puzzle for v in row):
+        if not value: continue
+        bit = 1 << (value - 1)
+        if not _candidates(state, i) & bit: return None
+        _place(state, i, bit)
+    return state
+
+def solve(puzzle, max_ms=None):
+    # Returns the first solution as 9x9 lists, or None if there is none.
+    # With max_ms, raises SolveTimeout if the search takes longer.
+    state = _initial_state(puzzle)
+    if state is None: return None
+    deadline = time.perf_counter() + max_ms / 1000 if max_ms is not None else None
+    solution = next(_search(state, deadline), None)
+    if solution is None: return None
+    return [solution[r * 9:r * 9 + 9] for r in range(9)]
+
+def count_solutions(puzzle, limit=2):
+    # Number of solutions, counting no further than `limit`
+    state = _initial_state(puzzle)
+    if state is None: return 0
+    return sum(1 for _ in islice(_search(state), limit))
+
+# --- 2. SUDOKU GENERATOR ---
+# Digging a hole keeps it only if the puzzle still has exactly one
+# solution. 50 holes takes 5-10 ms and random digging tops out around
+# 55-59, so the budget only matters on a badly loaded server.
+DIG_BUDGET_MS = 50
 class SudokuGenerator:
     def __init__(self):
         self.board = [[0 for _ in range(9)] for _ in range(9)]
 
-    def is_safe(self, row, col, num):
-        # Check Row & Col
-        for x in range(9):
-            if self.board[row][x] == num or self.board[x][col] == num:
-                return False
-        
-        # Check 3x3 Box
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(3):
-            for j in range(3):
-                if self.board[i + start_row][j + start_col] == num:
-                    return False
-        return True
-
     def fill_diagonal(self):
         for i in range(0, 9, 3):
             self.fill_box(i, i)
@@ -42,25 +152,25 @@ class SudokuGenerator:
         return True
 
     def solve(self):
-        for i in range(9):
-            for j in range(9):
-                if self.board[i][j] == 0:
-                    for num in range(1, 10):
-                        if self.is_safe(i, j, num):
-                            self.board[i][j] = num
-                            if self.solve():
-                                return True
-                            self.board[i][j] = 0
-                    return False
+        solution = solve(self.board)
+        if solution is None: return False
+        self.board = solution
         return True
 
-    def remove_digits(self, count):
-        while count > 0:
-            i = random.randint(0, 8)
-            j = random.randint(0, 8)
-            if self.board[i][j] != 0:
-                self.board[i][j] = 0
-                count -= 1
+    def remove_digits(self, count, max_ms=DIG_BUDGET_MS):
+        # Blanks up to `count` cells in random order, keeping each blank
+        # only while the solution stays unique. Returns the number blanked,
+        # which falls short if the cells or the time budget run out.
+        deadline = time.perf_counter() + max_ms / 1000
+        cells = [(i, j) for i in range(9) for j in range(9) if self.board[i][j]]
+        random.shuffle(cells)
+        removed = 0
+        for i, j in cells:
+            if removed == count or time.perf_counter() > deadline: break
+            value, self.board[i][j] = self.board[i][j], 0
+            if count_solutions(self.board) == 1: removed += 1
+            else: self.board[i][j] = value
+        return removed
 
     def generate(self, difficulty=30):
         # 1. Fill diagonals (independent)
@@ -69,9 +179,9 @@ class SudokuGenerator:
         self.solve()
         # 3. Save the Solution
         solution = [row[:] for row in self.board]
-        # 4. Remove digits to create puzzle
-        self.remove_digits(difficulty)
-        return {"puzzle": self.board, "solution": solution}
+        # 4. Remove digits to create puzzle, keeping one solution
+        holes = self.remove_digits(difficulty)
+        return {"puzzle": self.board, "solution": solution, "holes": holes}
 
 # --- EXPORT ---
 def get_new_sudoku(difficulty_level="medium"):
@@ -0,0 +1,107 @@
+# backend/app/sudoku_bench.py
+# Sudoku generation benchmark at fixed seeds: per-puzzle generation and
+# solve latency percentiles, holes actually dug, uniqueness checks per
+# puzzle, and a re-check that every puzzle has exactly one solution.
+#
+# Usage:
+#   python -m app.sudoku_bench                         # run, compare to baseline
+#   python -m app.sudoku_bench --save-baseline         # run, store as baseline
+#   python -m app.sudoku_bench --difficulties hard --puzzles 100
+#   python -m app.sudoku_bench --out results.json --tolerance 0.2
+import argparse
+import random
+import time
+from contextlib import contextmanager
+from . import sudoku_ai
+from .bench import add_baseline_args, dropped, finish, grew, latency
+from .sudoku_ai import count_solutions, get_new_sudoku, solve
+
+HOLES = {"easy": 30, "medium": 40, "hard": 50}
+
+# --- 1. INSTRUMENTATION ---
+@contextmanager
+def counting():
+    # Counts the uniqueness checks made while the block runs
+    counts = {"checks": 0}
+    original = sudoku_ai.count_solutions
+
+    def counted(*args, **kwargs):
+        counts["checks"] += 1
+        return original(*args, **kwargs)
+
+    sudoku_ai.count_solutions = counted
+    try:
+        yield counts
+    finally:
+        sudoku_ai.count_solutions = original
+
+# --- 2. RUNS ---
+def run_difficulty(difficulty, puzzles):
+    generate_ms, solve_ms, holes, unique = [], [], [], 0
+    with counting() as counts:
+        start = time.perf_counter()
+        for seed in range(puzzles):
+            random.seed(seed)
+            t = time.perf_counter()
+            game = get_new_sudoku(difficulty)
+            generate_ms.append((time.perf_counter() - t) * 1000)
+            holes.append(game["holes"])
+        elapsed = time.perf_counter() - start
+    # Solving and verification happen outside the counted block
+    for seed in range(puzzles):
+        random.seed(seed)
+        game = get_new_sudoku(difficulty)
+        t = time.perf_counter()
+        solved = solve(game["puzzle"])
+        solve_ms.append((time.perf_counter() - t) * 1000)
+        unique += solved == game["solution"] and count_solutions(game["puzzle"]) == 1
+    return {
+        "difficulty": difficulty, "puzzles": puzzles,
+        "puzzles_per_sec": round(puzzles / elapsed, 2) if elapsed > 0 else 0,
+        "generate_ms": latency(generate_ms),
+        "solve_ms": latency(solve_ms),
+        "checks_per_puzzle": round(counts["checks"] / puzzles, 1),
+        "holes_min": min(holes),
+        "short": sum(h < HOLES[difficulty] for h in holes),
+        "unique": unique,
+    }
+
+def run_benchmark(difficulties=("easy", "medium", "hard"), puzzles=50):
+    return {
+        "config": {"difficulties": list(difficulties), "puzzles": puzzles},
+        "results": [run_difficulty(d, puzzles) for d in difficulties],
+    }
+
+# --- 3. BASELINE COMPARISON ---
+def compare(result, baseline, tolerance):
+    # Returns a list of regressions: throughput may not drop, and p90
+    # generation latency may not grow, by more than `tolerance` (a
+    # fraction). Any non-unique or short puzzle is always reported.
+    problems = []
+    old_rows = {r["difficulty"]: r for r in baseline["results"]}
+    for row in result["results"]:
+        label = row["difficulty"]
+        if row["unique"] != row["puzzles"]:
+            problems.append(f"{label}: {row['puzzles'] - row['unique']} puzzle(s) without exactly one solution")
+        if row["short"]:
+            problems.append(f"{label}: {row['short']} puzzle(s) short of {HOLES[label]} holes")
+        old = old_rows.get(label)
+        if not old: continue
+        problems.append(dropped(f"{label} puzzles_per_sec", row["puzzles_per_sec"], old["puzzles_per_sec"], tolerance))
+        problems.append(grew(f"{label} p90 generation", row["generate_ms"]["p90"], old["generate_ms"]["p90"], tolerance, " ms"))
+    return [p for p in problems if p]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sudoku generation benchmark")
+    parser.add_argument("--difficulties", nargs="+", choices=tuple(HOLES), default=list(HOLES))
+    parser.add_argument("--puzzles", type=int, default=50, help="Puzzles per difficulty")
+    add_baseline_args(parser, "sudoku_bench")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.difficulties, args.puzzles)
+    for row in result["results"]:
+        print(f"{row['difficulty']:<6} {row['puzzles']:>4} puzzles {row['puzzles_per_sec']:>8} /s "
+              f"generate p50 {row['generate_ms']['p50']:>7} ms p90 {row['generate_ms']['p90']:>7} ms "
+              f"solve p50 {row['solve_ms']['p50']:>6} ms  {row['checks_per_puzzle']} checks/puzzle  "
+              f"unique {row['unique']}/{row['puzzles']}")
+    finish(result, args, compare)